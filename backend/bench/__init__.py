@@ -0,0 +1 @@
+"""Bench package: воспроизводимые бенчмарки бэкенда (запуск: python -m bench.<name>)."""
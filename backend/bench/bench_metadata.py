@@ -0,0 +1,78 @@
+"""Сравнение профилей yt-dlp "info" и "metadata": настоящий TikTokIE на записанной странице видео.
+
+Сетевые запросы yt-dlp отвечаются из словаря ответов (ReplayYoutubeDL), поэтому
+замеряется вся цепочка — разбор страницы экстрактором и обработка результата.
+
+    python -m bench.bench_metadata [--repeat 50]
+"""
+import argparse
+import io
+import json
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+import yt_dlp
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError
+
+from bench.fixtures import TIKTOK_URL, tiktok_item, tiktok_webpage
+from services.ytdlp import build_ydl_opts, extract_metadata
+
+
+class ReplayYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL, который отвечает на запросы экстракторов записанными телами вместо сети."""
+
+    responses: dict[str, bytes] = {}
+
+    def urlopen(self, req):
+        url = req if isinstance(req, str) else req.url
+        parts = urlsplit(url)
+        body = self.responses.get(f"{parts.scheme}://{parts.netloc}{parts.path}")
+        if body is None:
+            raise HTTPError(Response(io.BytesIO(b""), url, {}, status=404))
+        return Response(io.BytesIO(body), url, {"Content-Type": "text/html; charset=utf-8"})
+
+
+def _run(profile: str, url: str) -> dict:
+    with ReplayYoutubeDL(build_ydl_opts(profile)) as ydl:
+        if profile == "metadata":
+            return extract_metadata(ydl, url).to_dict()
+        return ydl.extract_info(url, download=False)
+
+
+def measure(profile: str, repeat: int) -> dict:
+    _run(profile, TIKTOK_URL)
+    tracemalloc.start()
+    _run(profile, TIKTOK_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = _run(profile, TIKTOK_URL)
+    elapsed = time.perf_counter() - start
+    return {
+        "profile": profile,
+        "mean_ms": round(elapsed / repeat * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "result_bytes": len(json.dumps(result, default=str)),
+    }
+
+
+def run(repeat: int = 50, formats: int = 60) -> list[dict]:
+    ReplayYoutubeDL.responses = {TIKTOK_URL: tiktok_webpage(tiktok_item(n_formats=formats)).encode()}
+    return [measure(profile, repeat) for profile in ("info", "metadata")]
+
+
+def main() -> list[dict]:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--formats", type=int, default=60)
+    args = parser.parse_args()
+    results = run(args.repeat, args.formats)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Накладные расходы инструментирования: span() и Histogram.observe() против пустого цикла.
+
+    python -m bench.bench_metrics [--iterations 200000]
+"""
+import argparse
+import json
+import threading
+import time
+
+from services.metrics import Histogram, registry, span
+
+
+def _per_op_ns(fn, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    fn(iterations)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def _baseline(iterations: int) -> None:
+    for _ in range(iterations):
+        pass
+
+
+def _observe(iterations: int) -> None:
+    histogram = Histogram("bench_observe", "", ("stage",))
+    for i in range(iterations):
+        histogram.observe(0.01 * (i % 100), "stage")
+
+
+def _span(iterations: int) -> None:
+    for _ in range(iterations):
+        with span("bench.span", "bench"):
+            pass
+
+
+def _span_contended(iterations: int, threads: int = 8) -> None:
+    per_thread = iterations // threads
+    workers = [threading.Thread(target=_span, args=(per_thread,)) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def run(iterations: int = 200000) -> dict:
+    baseline = _per_op_ns(_baseline, iterations)
+    results = {
+        "baseline_ns": round(baseline, 1),
+        "observe_ns": round(_per_op_ns(_observe, iterations) - baseline, 1),
+        "span_ns": round(_per_op_ns(_span, iterations) - baseline, 1),
+        "span_8_threads_ns": round(_per_op_ns(_span_contended, iterations) - baseline, 1),
+    }
+    start = time.perf_counter()
+    rendered = registry.render()
+    results["render_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    results["render_bytes"] = len(rendered)
+    return results
+
+
+def main() -> dict:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    results = run(args.iterations)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Холодный старт воркера: время от запуска процесса до первого ответа /health, первого /parse
+(YouTube через Data API, без yt-dlp) и до готовности yt-dlp после фонового прогрева.
+
+    python -m bench.cold_start [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+from bench.load import YOUTUBE_URL, run_backend
+from bench.mock_upstreams import MockUpstreams, UpstreamProfile
+
+
+def _wait_for_subsystem(base_url: str, name: str, timeout: float = 60) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        subsystems = requests.get(f"{base_url}/health", timeout=5).json().get("subsystems", {})
+        if subsystems.get(name, {}).get("state") in ("ready", "failed"):
+            return time.perf_counter() - start
+        time.sleep(0.01)
+    raise TimeoutError(f"{name} did not become ready")
+
+
+def measure_once(upstreams_url: str) -> dict:
+    with run_backend(upstreams_url) as (base_url, _, ready_after):
+        start = time.perf_counter()
+        requests.post(f"{base_url}/parse", data={"url": YOUTUBE_URL}, timeout=60).raise_for_status()
+        first_parse = ready_after + time.perf_counter() - start
+        ytdlp_ready = ready_after + (time.perf_counter() - start) + _wait_for_subsystem(base_url, "ytdlp")
+    return {"first_health_s": ready_after, "first_parse_s": first_parse, "ytdlp_ready_s": ytdlp_ready}
+
+
+def run(runs: int = 5) -> dict:
+    with MockUpstreams(UpstreamProfile()) as upstreams:
+        samples = [measure_once(upstreams.url) for _ in range(runs)]
+    return {
+        key: round(statistics.median(sample[key] for sample in samples), 3)
+        for key in samples[0]
+    } | {"runs": runs}
+
+
+def main() -> dict:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    results = run(args.runs)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
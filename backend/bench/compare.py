@@ -0,0 +1,52 @@
+"""Сравнение двух результатов bench.run: печатает изменение каждой числовой метрики.
+
+    python -m bench.compare base.json head.json [--threshold 5]
+"""
+import argparse
+import json
+from typing import Iterator
+
+
+# Метрики, у которых больше — лучше; для остальных (время, память) лучше меньше
+HIGHER_IS_BETTER = ("throughput_rps",)
+SKIPPED = ("timestamp", "cpu_count", "requests", "calls", "seed", "concurrency", "runs", "workers")
+
+
+def flatten(data, prefix: str = "") -> Iterator[tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            label = value.get("profile", index) if isinstance(value, dict) else index
+            yield from flatten(value, f"{prefix}[{label}]")
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        if not prefix.rsplit(".", 1)[-1] in SKIPPED:
+            yield prefix, float(data)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=5.0, help="порог в процентах для пометки регрессии")
+    args = parser.parse_args()
+    with open(args.base) as base_file, open(args.head) as head_file:
+        base, head = json.load(base_file), json.load(head_file)
+    head_values = dict(flatten(head))
+    regressions = 0
+    print(f"{'metric':70} {base.get('revision', 'base'):>12} {head.get('revision', 'head'):>12} {'change':>9}")
+    for name, before in flatten(base):
+        if name not in head_values:
+            continue
+        after = head_values[name]
+        change = (after - before) / before * 100 if before else 0.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        marker = " !" if worse > args.threshold else ""
+        regressions += bool(marker)
+        print(f"{name:70} {before:12.3f} {after:12.3f} {change:+8.1f}%{marker}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
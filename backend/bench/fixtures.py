@@ -0,0 +1,67 @@
+import json
+import random
+
+
+TIKTOK_VIDEO_ID = "7301234567890123456"
+TIKTOK_URL = f"https://www.tiktok.com/@recorded_user/video/{TIKTOK_VIDEO_ID}"
+
+
+def tiktok_item(n_formats: int = 60, seed: int = 1) -> dict:
+    """itemStruct из webapp.video-detail в том виде, в каком его отдаёт страница видео TikTok."""
+    rnd = random.Random(seed)
+    bitrate_info = []
+    for i in range(n_formats):
+        height = rnd.choice([360, 480, 540, 720, 1080])
+        codec = rnd.choice(["h264", "h265"])
+        bitrate_info.append({
+            "GearName": f"normal_{height}_{i}",
+            "Bitrate": rnd.randint(300_000, 4_000_000),
+            "QualityType": rnd.randint(1, 30),
+            "CodecType": codec,
+            "PlayAddr": {
+                "DataSize": rnd.randint(500_000, 20_000_000),
+                "Width": height * 9 // 16,
+                "Height": height,
+                "UrlKey": f"v12044gd0000_{codec}_{height}p_{rnd.randint(100_000, 999_999)}",
+                "UrlList": [
+                    f"https://v16-webapp.example-cdn.com/{TIKTOK_VIDEO_ID}/{i}/{mirror}/video.mp4"
+                    f"?expire=1700000000&signature={'x' * 120}"
+                    for mirror in range(3)
+                ],
+            },
+        })
+    return {
+        "id": TIKTOK_VIDEO_ID,
+        "desc": "Recorded video " + "lorem ipsum " * 10,
+        "createTime": "1704067200",
+        "author": {
+            "id": "6891234567890123456",
+            "uniqueId": "recorded_user",
+            "nickname": "Recorded Channel",
+            "secUid": "MS4wLjABAAAA" + "x" * 50,
+        },
+        "music": {"title": "original sound", "authorName": "recorded_user", "duration": 42},
+        "stats": {"playCount": 1234567, "diggCount": 89012, "commentCount": 3456, "shareCount": 78, "collectCount": 90},
+        "video": {
+            "duration": 42,
+            "width": 576,
+            "height": 1024,
+            "cover": f"https://p16-sign.example-cdn.com/{TIKTOK_VIDEO_ID}/cover.jpeg",
+            "originCover": f"https://p16-sign.example-cdn.com/{TIKTOK_VIDEO_ID}/origin_cover.jpeg",
+            "dynamicCover": f"https://p16-sign.example-cdn.com/{TIKTOK_VIDEO_ID}/dynamic_cover.jpeg",
+            "playAddr": f"https://v16-webapp.example-cdn.com/{TIKTOK_VIDEO_ID}/play.mp4",
+            "downloadAddr": f"https://v16-webapp.example-cdn.com/{TIKTOK_VIDEO_ID}/download.mp4",
+            "bitrateInfo": bitrate_info,
+        },
+    }
+
+
+def tiktok_webpage(item: dict) -> str:
+    """HTML страницы видео с __UNIVERSAL_DATA_FOR_REHYDRATION__, который разбирает TikTokIE."""
+    data = {"__DEFAULT_SCOPE__": {"webapp.video-detail": {"statusCode": 0, "itemInfo": {"itemStruct": item}}}}
+    return (
+        "<!DOCTYPE html><html><head><title>TikTok</title></head><body>"
+        + "<div class=\"feed\">" + "x" * 20_000 + "</div>"
+        + f"<script id=\"__UNIVERSAL_DATA_FOR_REHYDRATION__\" type=\"application/json\">{json.dumps(data)}</script>"
+        "</body></html>"
+    )
@@ -0,0 +1,255 @@
+"""Нагрузочный прогон FastAPI-приложения (main:app) против локальных заглушек.
+
+Поднимает bench.mock_upstreams, запускает uvicorn с PROXY_URLS/YOUTUBE_API_BASE,
+указывающими на заглушки, и гоняет сценарии /parse, /download и /media с
+фиксированной конкурентностью. parse_youtube и parse_youtube_compact идут к API
+заглушки на каждый запрос, parse_youtube_cached — попадание в кэш метаданных.
+
+    python -m bench.load --concurrency 16 --requests 400 --latency 0.05
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import requests
+
+from bench.mock_upstreams import MockUpstreams, UpstreamProfile
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+YOUTUBE_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+# Каждый запрос parse_youtube* — новое видео: иначе после прогрева всё отвечается
+# из кэша метаданных YouTube и --latency/--error-rate заглушек ни на что не влияют
+_youtube_ids = itertools.count()
+LIKEE_URL = "http://likee.video/@bench/video/7000000000000000001"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_kib(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def process_tree(pid: int) -> list[int]:
+    """Процесс и его дочерние процессы (воркеры gunicorn)."""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            pids.extend(int(child) for child in children.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+def total_peak_rss_kib(pid: int) -> Optional[int]:
+    """Суммарный пиковый RSS процесса и его воркеров."""
+    peaks = [peak_rss_kib(p) for p in process_tree(pid)]
+    if all(peak is None for peak in peaks):
+        return None
+    return sum(peak or 0 for peak in peaks)
+
+
+def reset_peak_rss(pid: int) -> None:
+    """Сбрасывает VmHWM до текущего RSS, чтобы замер после сценария показал пик только этого сценария."""
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+        except OSError:
+            pass
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60) -> float:
+    """Ждёт первого успешного ответа /health; возвращает время от запуска процесса."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"backend exited with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except requests.RequestException:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError("backend did not become ready")
+
+
+def backend_env(upstreams_url: str, media_dir: str, extra: Optional[dict] = None) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": BACKEND_DIR,
+        "YOUTUBE_KEY": "bench-key",
+        "YOUTUBE_API_BASE": f"{upstreams_url}/youtube/v3",
+        "PROXY_URLS": upstreams_url,
+        "PROXY_PINS": "",
+        "LIKEE_DELAY_SCALE": "0",
+        "MEDIA_DIR": media_dir,
+        "WATCHLIST_ENABLED": "false",
+        "WARM_HOSTS": "",
+        "WATCHLIST_DB": os.path.join(media_dir, "watchlist.sqlite3"),
+        "CACHE_DIR": media_dir,
+        "THUMB_CACHE_DIR": os.path.join(media_dir, "thumbs"),
+    })
+    env.update(extra or {})
+    return env
+
+
+def backend_command(port: int, workers: int) -> list[str]:
+    if workers > 1:
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app",
+                "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+
+@contextmanager
+def run_backend(upstreams_url: str, extra_env: Optional[dict] = None,
+                workers: int = 1) -> Iterator[tuple[str, subprocess.Popen, float]]:
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="bench-media-") as media_dir:
+        process = subprocess.Popen(
+            backend_command(port, workers),
+            cwd=BACKEND_DIR,
+            env=backend_env(upstreams_url, media_dir, extra_env),
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            ready_after = wait_until_ready(base_url, process)
+            yield base_url, process, ready_after
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def drive(call: Callable[[requests.Session], int], concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal errors
+        session = requests.Session()
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            start = time.perf_counter()
+            try:
+                status = call(session)
+            except requests.RequestException:
+                status = 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def uncached_youtube_url() -> str:
+    return f"https://www.youtube.com/watch?v=bench{next(_youtube_ids):06d}"
+
+
+def scenarios(base_url: str) -> dict[str, Callable[[requests.Session], int]]:
+    media_name: dict[str, str] = {}
+
+    def media(session: requests.Session) -> int:
+        if "name" not in media_name:
+            response = session.post(f"{base_url}/download", data={"url": LIKEE_URL}, timeout=120)
+            media_name["name"] = response.json()["filename"]
+        response = session.get(f"{base_url}/media/{media_name['name']}", timeout=60)
+        return response.status_code
+
+    return {
+        "parse_youtube": lambda s: s.post(f"{base_url}/parse", data={"url": uncached_youtube_url()}, timeout=60).status_code,
+        "parse_youtube_compact": lambda s: s.post(f"{base_url}/parse", data={"url": uncached_youtube_url(), "fields": "compact"}, timeout=60).status_code,
+        "parse_youtube_cached": lambda s: s.post(f"{base_url}/parse", data={"url": YOUTUBE_URL}, timeout=60).status_code,
+        "parse_likee": lambda s: s.post(f"{base_url}/parse", data={"url": LIKEE_URL}, timeout=60).status_code,
+        "download_likee": lambda s: s.post(f"{base_url}/download", data={"url": LIKEE_URL}, timeout=120).status_code,
+        "media": media,
+    }
+
+
+def run(profile: UpstreamProfile, concurrency: int, total: int, only: Optional[list[str]] = None,
+        extra_env: Optional[dict] = None, workers: int = 1) -> dict:
+    results: dict = {"concurrency": concurrency, "workers": workers, "upstream": profile.__dict__.copy(), "scenarios": {}}
+    with MockUpstreams(profile) as upstreams, \
+            run_backend(upstreams.url, extra_env, workers) as (base_url, process, ready_after):
+        results["cold_start_s"] = round(ready_after, 3)
+        for name, call in scenarios(base_url).items():
+            if only and name not in only:
+                continue
+            call(requests.Session())  # прогрев
+            reset_peak_rss(process.pid)
+            stats = drive(call, concurrency, total)
+            stats["peak_rss_kib"] = total_peak_rss_kib(process.pid)
+            results["scenarios"][name] = stats
+    return results
+
+
+def main() -> dict:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1, help=">1 — запуск через gunicorn (gunicorn.conf.py)")
+    parser.add_argument("--only", nargs="*")
+    args = parser.parse_args()
+    profile = UpstreamProfile(args.latency, args.jitter, args.error_rate, args.payload_size)
+    results = run(profile, args.concurrency, args.requests, args.only, workers=args.workers)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
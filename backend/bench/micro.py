@@ -0,0 +1,68 @@
+"""Микробенчмарки горячих функций разбора: Likee JSON/meta, числа с суффиксами, классификация URL.
+
+    python -m bench.micro [--repeat 5]
+"""
+import argparse
+import json
+import timeit
+
+from bench.mock_upstreams import likee_page, likee_video
+from services.likee import extract_from_meta_tags, parse_likee_json_data, parse_short_number
+from services.platforms import detect_platform
+
+
+URLS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://likee.video/@user/video/7000000000000000001",
+    "https://l.likee.video/v/AbCdEf",
+    "https://vk.com/video-12345_67890",
+    "https://vkvideo.ru/clip-1_2",
+    "https://www.tiktok.com/@user/video/7301234567890123456",
+    "https://www.instagram.com/reel/Cxyz123/",
+    "https://example.com/some/video",
+]
+
+SHORT_NUMBERS = ["12", "1.2K", "3,4M", "5Б", "7.5Т", 42, 3.9, "", None, "abc"]
+
+
+def _nested_likee_data(depth: int = 6) -> dict:
+    data: dict = {"video": likee_video("7000000000000000001")}
+    for level in range(depth):
+        data = {"wrapper": data, "meta": {"level": level, "items": list(range(10))}}
+    return data
+
+
+def cases() -> dict:
+    nested = _nested_likee_data()
+    page = likee_page(likee_video("7000000000000000001"), 100_000)
+    return {
+        "parse_likee_json_data": lambda: parse_likee_json_data(nested),
+        "extract_from_meta_tags": lambda: extract_from_meta_tags(page),
+        "parse_short_number": lambda: [parse_short_number(value) for value in SHORT_NUMBERS],
+        "detect_platform": lambda: [detect_platform(url) for url in URLS],
+    }
+
+
+def run(repeat: int = 5, min_time: float = 0.2) -> dict:
+    results = {}
+    for name, fn in cases().items():
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        number = max(number, int(number * min_time / 0.2))
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = {"us_per_call": round(best * 1e6, 3), "calls": number}
+    return results
+
+
+def main() -> dict:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    results = run(args.repeat)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
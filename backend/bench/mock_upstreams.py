@@ -0,0 +1,230 @@
+"""Локальные заглушки внешних сервисов: YouTube Data API, страницы/API Likee и CDN видео.
+
+Сервер одновременно работает как HTTP-прокси: бэкенд запускается с
+PROXY_URLS, указывающим на него, и запросы к http://likee.video/... и
+http://cdn.mock/... приходят сюда в absolute-form.
+
+    python -m bench.mock_upstreams --port 9100 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+CDN_HOST = "cdn.mock"
+# Как удалённые и приватные видео в videos.list: такие id в ответе просто отсутствуют
+MISSING_VIDEO_PREFIX = "missing"
+
+
+@dataclass
+class UpstreamProfile:
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    payload_size: int = 1_000_000
+    seed: int = 1
+
+
+class MockUpstreams:
+    def __init__(self, profile: UpstreamProfile, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile
+        self.random = random.Random(profile.seed)
+        self._random_lock = threading.Lock()
+        self.payload = bytes(range(256)) * (profile.payload_size // 256 + 1)
+        self.payload = self.payload[:profile.payload_size]
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockUpstreams":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "MockUpstreams":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _roll(self) -> tuple[float, bool]:
+        with self._random_lock:
+            delay = self.profile.latency + self.random.uniform(0, self.profile.jitter)
+            failed = self.random.random() < self.profile.error_rate
+        return delay, failed
+
+    def _handler_class(self):
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self._dispatch(head=True)
+
+            def do_GET(self):
+                self._dispatch(head=False)
+
+            def _dispatch(self, head: bool):
+                parts = urlsplit(self.path)
+                host = parts.hostname or (self.headers.get("Host") or "").split(":")[0]
+                delay, failed = upstreams._roll()
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    return self._send(503, b"upstream error", "text/plain", head)
+                query = parse_qs(parts.query)
+                if host == CDN_HOST:
+                    return self._send(200, upstreams.payload, "video/mp4", head)
+                if "likee" in host:
+                    return self._likee(parts.path, query, head)
+                if parts.path.endswith("/youtube/v3/videos"):
+                    return self._youtube_videos(query, head)
+                if parts.path.endswith("/youtube/v3/commentThreads"):
+                    return self._youtube_comments(query, head)
+                return self._send(404, b"not found", "text/plain", head)
+
+            def _send(self, status: int, body: bytes, content_type: str, head: bool, headers: Optional[dict] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def _send_json(self, data: dict, head: bool, headers: Optional[dict] = None):
+                self._send(200, json.dumps(data).encode(), "application/json", head, headers)
+
+            def _likee(self, path: str, query: dict, head: bool):
+                match = re.search(r"/video/(\d+)", path) or re.search(r"(\d+)", query.get("postIds", query.get("postId", [""]))[0])
+                post_id = match.group(1) if match else "1"
+                video = likee_video(post_id)
+                if "videoApi" in path or "/rest/" in path or "videoinfo" in path:
+                    return self._send_json({"data": {"videoList": [video]}}, head)
+                return self._send(200, likee_page(video, upstreams.profile.payload_size // 10).encode(), "text/html", head)
+
+            def _youtube_videos(self, query: dict, head: bool):
+                ids = query.get("id", [""])[0].split(",")
+                etag = '"bench-etag"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, b"", "application/json", head)
+                items = [youtube_video(v) for v in ids if v and not v.startswith(MISSING_VIDEO_PREFIX)]
+                self._send_json({"etag": etag, "items": items}, head)
+
+            def _youtube_comments(self, query: dict, head: bool):
+                page = int(query.get("pageToken", ["0"])[0] or 0)
+                video_id = query.get("videoId", [""])[0]
+                data = {"items": [youtube_comment(video_id, page, i) for i in range(100)]}
+                if page < 9:
+                    data["nextPageToken"] = str(page + 1)
+                self._send_json(data, head)
+
+        return Handler
+
+
+def likee_video(post_id: str) -> dict:
+    return {
+        "post_id": post_id,
+        "video_url": f"http://{CDN_HOST}/video/{post_id}.mp4",
+        "msg_text": f"Bench video {post_id}",
+        "coverUrl": f"http://{CDN_HOST}/cover/{post_id}.jpg",
+        "nick_name": "bench_author",
+        "poster_uid": "100500",
+        "like_count": "12.5K",
+        "video_count": "1.2M",
+        "comment_count": 345,
+        "share_count": 67,
+        "download_count": 8,
+    }
+
+
+def likee_page(video: dict, padding: int) -> str:
+    filler = "<div class=\"feed-item\">" + "x" * 200 + "</div>\n"
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<meta property=\"og:title\" content=\"{video['msg_text']}\">"
+        f"<meta property=\"og:image\" content=\"{video['coverUrl']}\">"
+        f"<meta property=\"og:video\" content=\"{video['video_url']}\">"
+        "</head><body>"
+        + filler * max(padding // len(filler), 1)
+        + f"<script>window.data = {json.dumps({'video': video})};</script>"
+        "</body></html>"
+    )
+
+
+def youtube_video(video_id: str) -> dict:
+    return {
+        "id": video_id,
+        "snippet": {
+            "title": f"Bench video {video_id}",
+            "channelTitle": "Bench Channel",
+            "channelId": "UCbench",
+            "description": "Описание " * 100,
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "tags": [f"tag{i}" for i in range(20)],
+            "categoryId": "22",
+            "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+        },
+        "statistics": {"viewCount": "123456", "likeCount": "7890", "commentCount": "321"},
+        "contentDetails": {"duration": "PT4M13S"},
+    }
+
+
+def youtube_comment(video_id: str, page: int, index: int) -> dict:
+    comment_id = f"{video_id}.{page}.{index}"
+    return {
+        "id": comment_id,
+        "snippet": {
+            "totalReplyCount": index % 3,
+            "topLevelComment": {
+                "id": comment_id,
+                "snippet": {
+                    "authorDisplayName": f"user{index}",
+                    "authorChannelId": {"value": f"UC{index}"},
+                    "textOriginal": "Комментарий " * 10,
+                    "likeCount": index,
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                },
+            },
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+    profile = UpstreamProfile(args.latency, args.jitter, args.error_rate, args.payload_size)
+    upstreams = MockUpstreams(profile, args.host, args.port)
+    print(f"mock upstreams on {upstreams.url}")
+    upstreams.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
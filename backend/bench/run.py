@@ -0,0 +1,60 @@
+"""Полный прогон бенчмарков с машиночитаемым результатом для сравнения между коммитами.
+
+    python -m bench.run --output bench/results/$(git rev-parse --short HEAD).json
+    python -m bench.compare bench/results/old.json bench/results/new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+from bench import bench_metadata, bench_metrics, cold_start, load, micro
+from bench.mock_upstreams import UpstreamProfile
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=load.BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> dict:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="куда записать JSON с результатами")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=1_000_000)
+    parser.add_argument("--skip-load", action="store_true")
+    args = parser.parse_args()
+    results: dict = {
+        "revision": git_revision(),
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "micro": micro.run(),
+        "metadata": bench_metadata.run(),
+        "metrics": bench_metrics.run(),
+    }
+    if not args.skip_load:
+        results["cold_start"] = cold_start.run()
+        profile = UpstreamProfile(args.latency, 0.0, args.error_rate, args.payload_size)
+        results["load"] = load.run(profile, args.concurrency, args.requests)
+    rendered = json.dumps(results, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as output:
+            output.write(rendered + "\n")
+    print(rendered)
+    return results
+
+
+if __name__ == "__main__":
+    main()
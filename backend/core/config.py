@@ -6,8 +6,72 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _env_list(name: str) -> list[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def _env_map(name: str) -> dict[str, str]:
+    result: dict[str, str] = {}
+    for item in _env_list(name):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() and value.strip():
+            result[key.strip().lower()] = value.strip()
+    return result
+
+
 MEDIA_DIR: str = os.getenv("MEDIA_DIR", "media")
+# Бэкенд кэшей: "memory" (свой у каждого воркера) или "sqlite" (общий файл для всех воркеров хоста)
+CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_DIR: str = os.getenv("CACHE_DIR", "data")
+
+# Прокси-кэш превью: /thumb/{key}
+THUMB_CACHE_DIR: str = os.getenv("THUMB_CACHE_DIR", "data/thumbs")
+THUMB_CACHE_MAX_BYTES: int = int(os.getenv("THUMB_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+THUMB_MAX_SOURCE_BYTES: int = int(os.getenv("THUMB_MAX_SOURCE_BYTES", str(10 * 1024 * 1024)))
+THUMB_KEY_TTL: float = float(os.getenv("THUMB_KEY_TTL", str(30 * 24 * 3600)))
 YOUTUBE_API_KEY: str | None = os.getenv("YOUTUBE_KEY")
+YOUTUBE_API_BASE: str = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+# Кэш метаданных YouTube: TTL свежести и окно, в котором отдаём устаревшую запись во время ревалидации
+YOUTUBE_CACHE_TTL: float = float(os.getenv("YOUTUBE_CACHE_TTL", "300"))
+YOUTUBE_CACHE_STALE_SECONDS: float = float(os.getenv("YOUTUBE_CACHE_STALE_SECONDS", "3600"))
+YOUTUBE_CACHE_SIZE: int = int(os.getenv("YOUTUBE_CACHE_SIZE", "10000"))
 PROXY_URL: str | None = os.getenv("PROXY_URL")
+# Множитель случайных пауз перед запросами к Likee (0 — без пауз, например для бенчмарков)
+LIKEE_DELAY_SCALE: float = float(os.getenv("LIKEE_DELAY_SCALE", "1"))
+
+# Пул прокси: PROXY_URLS=http://a:8080,http://b:8080 (PROXY_URL остаётся для совместимости)
+PROXY_URLS: list[str] = _env_list("PROXY_URLS") or ([PROXY_URL] if PROXY_URL else [])
+# Закрепление прокси за платформой: PROXY_PINS=youtube=http://a:8080,likee=http://b:8080
+PROXY_PINS: dict[str, str] = _env_map("PROXY_PINS")
+PROXY_EJECT_ERRORS: int = int(os.getenv("PROXY_EJECT_ERRORS", "3"))
+PROXY_EJECT_ERROR_RATE: float = float(os.getenv("PROXY_EJECT_ERROR_RATE", "0.5"))
+PROXY_EJECT_SECONDS: float = float(os.getenv("PROXY_EJECT_SECONDS", "30"))
+PROXY_PROBE_URL: str = os.getenv("PROXY_PROBE_URL", "https://www.google.com/generate_204")
+
+# Кэш DNS в процессе. Системный резолвер не сообщает TTL записи, поэтому срок жизни задаётся здесь;
+# при ошибке резолва ещё DNS_CACHE_STALE_SECONDS отдаём последний успешный ответ
+DNS_CACHE_TTL: float = float(os.getenv("DNS_CACHE_TTL", "60"))
+DNS_CACHE_STALE_SECONDS: float = float(os.getenv("DNS_CACHE_STALE_SECONDS", "300"))
+# Прогретые соединения к горячим хостам: WARM_HOSTS=likee.video=likee,www.googleapis.com=youtube
+WARM_HOSTS: dict[str, str] = _env_map("WARM_HOSTS") if os.getenv("WARM_HOSTS") is not None else {
+    "likee.video": "likee",
+    "api.like-video.com": "likee",
+    "www.googleapis.com": "youtube",
+}
+WARM_CONNECTIONS_PER_HOST: int = int(os.getenv("WARM_CONNECTIONS_PER_HOST", "2"))
+WARM_REFRESH_SECONDS: float = float(os.getenv("WARM_REFRESH_SECONDS", "15"))
+# Переподключаемся раньше, чем сервер закроет простаивающее keep-alive соединение
+WARM_MAX_IDLE_SECONDS: float = float(os.getenv("WARM_MAX_IDLE_SECONDS", "50"))
 
+# Токен для /admin/* (профайлер); без токена админские эндпоинты отключены
+ADMIN_TOKEN: str | None = os.getenv("ADMIN_TOKEN")
+PROFILER_MAX_SECONDS: float = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
 
+# Watchlist: периодическое обновление счётчиков просмотров/лайков/комментариев
+WATCHLIST_ENABLED: bool = os.getenv("WATCHLIST_ENABLED", "true").lower() in ("1", "true", "yes")
+WATCHLIST_DB: str = os.getenv("WATCHLIST_DB", "data/watchlist.sqlite3")
+WATCHLIST_TICK_SECONDS: float = float(os.getenv("WATCHLIST_TICK_SECONDS", "30"))
+WATCHLIST_MIN_INTERVAL: float = float(os.getenv("WATCHLIST_MIN_INTERVAL", "300"))
+WATCHLIST_MAX_INTERVAL: float = float(os.getenv("WATCHLIST_MAX_INTERVAL", "86400"))
+WATCHLIST_BATCH_LIMIT: int = int(os.getenv("WATCHLIST_BATCH_LIMIT", "500"))
+WATCHLIST_CONCURRENCY: int = int(os.getenv("WATCHLIST_CONCURRENCY", "8"))
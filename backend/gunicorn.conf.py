@@ -0,0 +1,46 @@
+"""Боевой режим: gunicorn пре-форкает воркеры uvicorn.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Плавный перезапуск воркеров: `kill -HUP <pid мастера>`; воркер перезапускается
+после MAX_REQUESTS запросов (± джиттер), чтобы ограничить рост памяти yt-dlp.
+"""
+import math
+import os
+
+
+def available_cpus() -> int:
+    """CPU, доступные процессу: affinity/cpuset и квота CFS из cgroup v2 (`--cpus`, limits.cpus)."""
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()[:2]
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# Не все CPU хоста, а доступные контейнеру. Квоту cgroup v1 не читаем — там задавайте WEB_CONCURRENCY.
+# WEB_CONCURRENCY не пробрасываем пустым: gunicorn сам делает int() от него при импорте
+workers = int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+worker_class = "uvicorn.workers.UvicornWorker"
+
+max_requests = int(os.getenv("MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "100"))
+# Скачивание через yt-dlp бывает долгим: не убиваем воркер посреди запроса
+timeout = int(os.getenv("WORKER_TIMEOUT", "300"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+accesslog = os.getenv("ACCESS_LOG") or None
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Несколько воркеров должны видеть общий кэш; хук выполняется в мастере до форка
+    # (уже с учётом --workers из командной строки), воркеры наследуют окружение
+    if server.cfg.workers > 1:
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
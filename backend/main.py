@@ -1,14 +1,35 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
 import os
+import time
 
-from core.config import MEDIA_DIR
+from core.config import (
+    MEDIA_DIR,
+    PROXY_EJECT_SECONDS,
+    WARM_CONNECTIONS_PER_HOST,
+    WARM_HOSTS,
+    WARM_MAX_IDLE_SECONDS,
+    WARM_REFRESH_SECONDS,
+    WATCHLIST_ENABLED,
+    WATCHLIST_TICK_SECONDS,
+)
+from services.keepwarm import ConnectionKeeper, run_keeper
+from services.metrics import REQUEST_SECONDS
+from services.proxy_pool import proxy_pool, run_prober
+from services.readiness import DISABLED, READY, readiness
+from services.watchlist import get_watchlist, run_scheduler
+from services.ytdlp import warm_up
 from routers.parse import router as parse_router
 from routers.info import router as info_router
 from routers.system import router as system_router
+from routers.admin import router as admin_router
+from routers.watchlist import router as watchlist_router
+from routers.thumbs import router as thumbs_router
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +39,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def observe_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # Шаблон маршрута вместо пути, чтобы /media/{filename} не плодил серии
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(time.perf_counter() - start, getattr(route, "path", "unmatched"), request.method, status)
+
+
 # гарантируем существование директории для медиа
 os.makedirs(MEDIA_DIR, exist_ok=True)
 
@@ -25,6 +61,26 @@ os.makedirs(MEDIA_DIR, exist_ok=True)
 app.include_router(parse_router)
 app.include_router(info_router)
 app.include_router(system_router)
+app.include_router(admin_router)
+app.include_router(watchlist_router)
+app.include_router(thumbs_router)
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Прогрев в фоне: uvicorn начинает принимать соединения, не дожидаясь импорта yt-dlp
+    app.state.warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+    # Возвращаем выброшенные прокси в пул после пробного запроса
+    app.state.proxy_prober = asyncio.create_task(run_prober(proxy_pool, max(PROXY_EJECT_SECONDS / 2, 1)))
+    # Заранее открываем TCP+TLS к горячим хостам и переоткрываем их до таймаута простоя
+    if WARM_HOSTS and WARM_CONNECTIONS_PER_HOST > 0:
+        keeper = ConnectionKeeper(WARM_HOSTS, WARM_CONNECTIONS_PER_HOST, WARM_MAX_IDLE_SECONDS)
+        app.state.connection_keeper = asyncio.create_task(run_keeper(keeper, WARM_REFRESH_SECONDS))
+    if WATCHLIST_ENABLED:
+        app.state.watchlist_scheduler = asyncio.create_task(run_scheduler(get_watchlist(), WATCHLIST_TICK_SECONDS))
+        readiness.set("watchlist", READY)
+    else:
+        readiness.set("watchlist", DISABLED)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+import asyncio
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from core.config import ADMIN_TOKEN, PROFILER_MAX_SECONDS
+from services.platforms import PLATFORMS
+from services.profiler import DEFAULT_ARM_TIMEOUT, ProfilerBusy, profiler_controller, render_collapsed
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Админские эндпоинты отключены: ADMIN_TOKEN не задан")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Неверный админский токен")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    try:
+        collapsed, samples = await asyncio.to_thread(profiler_controller.profile_for, seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Профайлер уже запущен на этом воркере")
+    return PlainTextResponse(collapsed, headers={"X-Profile-Samples": str(samples)})
+
+
+@router.post("/profile/requests")
+def arm_request_profiling(
+    platform: str = Query(...),
+    count: int = Query(1, ge=1, le=100),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    timeout: float = Query(DEFAULT_ARM_TIMEOUT, gt=0, le=86400),
+):
+    platform = platform.lower()
+    if platform not in PLATFORMS:
+        raise HTTPException(status_code=400, detail=f"Неизвестная платформа: {platform}. Допустимые: {', '.join(PLATFORMS)}")
+    try:
+        session = profiler_controller.arm_requests(platform, count, interval_ms / 1000, timeout)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Профайлер уже запущен на этом воркере")
+    return session.as_dict()
+
+
+@router.get("/profile/requests")
+def get_request_profile():
+    session = profiler_controller.requests
+    if session is None:
+        raise HTTPException(status_code=404, detail="Профилирование запросов не запускалось")
+    # Истёкший сеанс отдаёт то, что успел собрать
+    if session.active or not session.captured:
+        return session.as_dict()
+    return PlainTextResponse(render_collapsed(session.stacks), headers={"X-Profile-Requests": str(session.captured)})
+
+
+@router.delete("/profile/requests")
+def cancel_request_profiling():
+    session = profiler_controller.cancel_requests()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Профилирование запросов не запускалось")
+    return session.as_dict()
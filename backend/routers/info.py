@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Form, HTTPException
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Form, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from core.config import YOUTUBE_API_KEY
 from services.utils import extract_video_id_from_url
 from services.likee import is_likee_url, extract_video_id_from_likee_url
 from services.youtube import get_youtube_video_info_via_api
+from services.youtube_comments import CommentStream, iter_ndjson
 
 
 router = APIRouter()
@@ -49,6 +53,17 @@ async def get_youtube_info_api(video_id: str = Form(...)):
     return {"success": True, "data": info, "source": "youtube_api"}
 
 
+@router.get("/youtube/comments")
+def stream_youtube_comments(
+    video_id: str = Query(...),
+    limit: int = Query(100, ge=1, le=100000),
+    cursor: Optional[str] = Query(None),
+    order: Literal["time", "relevance"] = Query("time"),
+):
+    stream = CommentStream(video_id, limit, cursor, order)
+    return StreamingResponse(iter_ndjson(stream), media_type="application/x-ndjson")
+
+
 @router.post("/likee/info")
 async def get_likee_info(url: str = Form(...)):
     from services.likee import extract_likee_info, is_likee_url
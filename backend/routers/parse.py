@@ -1,9 +1,10 @@
 from typing import Optional
 import os
+import time
 import uuid
 
-import yt_dlp
-from fastapi import APIRouter, Form, HTTPException
+from fastapi import APIRouter, Form, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 
 from core.config import MEDIA_DIR, YOUTUBE_API_KEY
 from services.utils import (
@@ -24,19 +25,32 @@ from services.likee import (
 )
 from services.youtube import get_youtube_video_info_via_api
 from services.utils import create_robust_session
+from services.platforms import detect_platform
+from services.fields import parse_fields, select_fields, wants, youtube_parts
+from services.metrics import collect_timings, span
+from services.profiler import profiler_controller
+from services.thumbnails import register_thumbnail
+from services.ytdlp import METADATA_PLATFORMS, build_ydl_opts, extract_metadata, open_ydl
 
 
 router = APIRouter()
 
 
-def _get_video_info(url: str, sessionid: str = "", csrftoken: str = "", ds_user_id: str = ""):
+def _extract_info(ydl, url: str, metadata_only: bool) -> dict:
+    if metadata_only:
+        # Сразу проецируем сырой info dict в компактную запись, чтобы он не жил дольше запроса
+        return extract_metadata(ydl, url).to_dict()
+    return ydl.extract_info(url, download=False)
+
+
+def _get_video_info(url: str, sessionid: str = "", csrftoken: str = "", ds_user_id: str = "", fields: Optional[frozenset] = None):
     try:
         if is_youtube_url(url):
             try:
                 video_id = extract_video_id_from_url(url)
                 if YOUTUBE_API_KEY:
                     try:
-                        youtube_info = get_youtube_video_info_via_api(video_id)
+                        youtube_info = get_youtube_video_info_via_api(video_id, youtube_parts(fields))
                         return youtube_info
                     except Exception:
                         pass
@@ -78,22 +92,16 @@ def _get_video_info(url: str, sessionid: str = "", csrftoken: str = "", ds_user_
             else:
                 raise HTTPException(status_code=404, detail="Видео Likee не найдено или недоступно. Проверьте корректность ссылки и убедитесь что видео не удалено.")
 
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'writeinfojson': False,
-            'writesubtitles': False,
-        }
-        from core.config import PROXY_URL
-        if PROXY_URL:
-            ydl_opts['proxy'] = PROXY_URL
+        platform = detect_platform(url)
+        # Без запрошенных комментариев полная обработка yt-dlp не нужна ни одной платформе
+        metadata_only = platform in METADATA_PLATFORMS or not wants(fields, "comments")
+        ydl_opts = build_ydl_opts("metadata" if metadata_only else "info")
         if sessionid and csrftoken and ds_user_id and is_instagram_url(url):
             cookies_file = create_cookies_file(sessionid, csrftoken, ds_user_id)
             ydl_opts["cookiefile"] = cookies_file
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    result = ydl.extract_info(url, download=False)
+                with open_ydl(ydl_opts, platform) as ydl:
+                    result = _extract_info(ydl, url, metadata_only)
                 return result
             finally:
                 try:
@@ -101,8 +109,8 @@ def _get_video_info(url: str, sessionid: str = "", csrftoken: str = "", ds_user_
                 except Exception:
                     pass
         else:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                return ydl.extract_info(url, download=False)
+            with open_ydl(ydl_opts, platform) as ydl:
+                return _extract_info(ydl, url, metadata_only)
     except HTTPException:
         raise
     except Exception as e:
@@ -127,8 +135,19 @@ def _get_video_info(url: str, sessionid: str = "", csrftoken: str = "", ds_user_
 
 
 @router.post("/parse")
-async def parse_url(url: str = Form(...), sessionid: str = Form(""), csrftoken: str = Form(""), ds_user_id: str = Form("")):
-    info = _get_video_info(url, sessionid, csrftoken, ds_user_id)
+async def parse_url(
+    request: Request,
+    url: str = Form(...),
+    sessionid: str = Form(""),
+    csrftoken: str = Form(""),
+    ds_user_id: str = Form(""),
+    fields: str = Form(""),
+):
+    selected = parse_fields(fields)
+    debug_timings = request.headers.get("x-debug-timings", "").lower() in ("1", "true", "yes")
+    started = time.perf_counter()
+    with collect_timings(debug_timings) as timings, profiler_controller.capture(detect_platform(url)):
+        info = _get_video_info(url, sessionid, csrftoken, ds_user_id, selected)
     title = info.get("title") or "Без названия"
     author = info.get("uploader") or info.get("channel") or "Неизвестный автор"
     views = info.get("view_count")
@@ -147,6 +166,11 @@ async def parse_url(url: str = Form(...), sessionid: str = Form(""), csrftoken:
         "likes": likes,
         "comment_count": comment_count,
         "thumbnail": thumbnail_url,
+        # Ключ превью пишется в кэш (в режиме sqlite — запись на диск), только если поле запрошено
+        "thumbnail_proxy": (
+            f"/thumb/{register_thumbnail(thumbnail_url)}"
+            if thumbnail_url and wants(selected, "thumbnail_proxy") else None
+        ),
         "description": info.get("description"),
         "comments": comments,
         "url": url,
@@ -170,7 +194,12 @@ async def parse_url(url: str = Form(...), sessionid: str = Form(""), csrftoken:
             "downloads": info.get("_likee_downloads", 0),
             "platform": "likee",
         })
-    return result
+    result = select_fields(result, selected)
+    if timings is not None:
+        result["_timings"] = {"total_ms": round((time.perf_counter() - started) * 1000, 2), "stages": timings}
+    # Без response_model FastAPI всё равно прогоняет dict через jsonable_encoder;
+    # готовый ответ отдаётся в orjson напрямую
+    return ORJSONResponse(result)
 
 
 @router.post("/download")
@@ -188,11 +217,12 @@ async def download_url(
             video_url = info.get("_likee_video_url")
             if not video_url:
                 raise HTTPException(status_code=400, detail="Не удалось получить прямую ссылку на видео Likee")
-            session = create_robust_session()
+            session = create_robust_session("likee")
             headers = get_mobile_headers()
             response = session.get(video_url, headers=headers, stream=True, timeout=60)
             response.raise_for_status()
-            with open(filepath, 'wb') as f:
+            # Тело читается потоком, поэтому этап включает и скачивание, и запись на диск
+            with span("likee.download", "likee"), open(filepath, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     if chunk:
                         f.write(chunk)
@@ -201,16 +231,13 @@ async def download_url(
                 os.remove(filepath)
                 raise HTTPException(status_code=400, detail="Скачанный файл пуст")
             return {"filename": filename, "size": file_size}
-        ydl_opts = {
-            "outtmpl": filepath,
-            "quiet": True,
-            "format": "best[ext=mp4]/best",
-        }
+        platform = detect_platform(url)
+        ydl_opts = build_ydl_opts("download", outtmpl=filepath)
         if sessionid and csrftoken and ds_user_id and is_instagram_url(url):
             cookies_file = create_cookies_file(sessionid, csrftoken, ds_user_id)
             ydl_opts["cookiefile"] = cookies_file
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with open_ydl(ydl_opts, platform, "ytdlp.download") as ydl:
                     ydl.download([url])
                 file_size = os.path.getsize(filepath)
                 return {"filename": filename, "size": file_size}
@@ -220,7 +247,7 @@ async def download_url(
                 except Exception:
                     pass
         else:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with open_ydl(ydl_opts, platform, "ytdlp.download") as ydl:
                 ydl.download([url])
             file_size = os.path.getsize(filepath)
             return {"filename": filename, "size": file_size}
@@ -1,8 +1,11 @@
 import os
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from core.config import MEDIA_DIR, YOUTUBE_API_KEY
+from services.metrics import registry
+from services.proxy_pool import proxy_pool
+from services.readiness import readiness
 
 
 router = APIRouter()
@@ -18,14 +21,27 @@ def get_media(filename: str):
 
 @router.get("/health")
 def health_check():
+    subsystems = readiness.snapshot()
+    subsystems["youtube_api"] = {"state": "ready" if YOUTUBE_API_KEY else "disabled"}
+    proxies = proxy_pool.snapshot()
+    if proxies:
+        subsystems["proxies"] = {"state": "ready" if any(p["healthy"] for p in proxies) else "degraded"}
     return {
         "status": "healthy",
+        "ready": readiness.all_ready(),
+        "subsystems": subsystems,
         "supported_platforms": ["Instagram", "VK", "Likee", "YouTube", "TikTok"],
         "youtube_api_available": bool(YOUTUBE_API_KEY),
         "likee_extractors": ["mobile_request", "api_request", "meta_tags"],
+        "proxies": proxy_pool.snapshot(),
     }
 
 
+@router.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @router.get("/config")
 def get_config():
     return {
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+
+from services.thumbnails import THUMB_FORMATS, THUMB_WIDTHS, get_thumbnail
+
+
+router = APIRouter()
+
+# Ключ превью — хэш исходного URL, поэтому вариант по ключу никогда не меняется
+THUMB_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _negotiate_format(fmt: str, accept: str) -> str:
+    if fmt == "auto":
+        return "webp" if "image/webp" in accept else "jpeg"
+    if fmt not in THUMB_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Неподдерживаемый формат превью: {fmt}")
+    return fmt
+
+
+@router.get("/thumb/{key}")
+def get_thumb(request: Request, key: str, w: int = Query(320, gt=0), fmt: str = Query("auto")):
+    if w not in THUMB_WIDTHS:
+        raise HTTPException(status_code=400, detail=f"Ширина превью должна быть одной из: {', '.join(map(str, THUMB_WIDTHS))}")
+    negotiated = _negotiate_format(fmt.lower(), request.headers.get("accept", ""))
+    path, media_type = get_thumbnail(key, w, negotiated)
+    headers = {"Cache-Control": THUMB_CACHE_CONTROL}
+    if fmt.lower() == "auto":
+        headers["Vary"] = "Accept"
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Form, HTTPException, Query
+
+from services.watchlist import get_watchlist
+
+
+router = APIRouter()
+
+
+@router.post("/watchlist")
+def add_to_watchlist(url: str = Form(...)):
+    if not url.strip():
+        raise HTTPException(status_code=400, detail="URL не предоставлен")
+    item = get_watchlist().add(url)
+    return {"success": True, "data": item.as_dict()}
+
+
+@router.get("/watchlist")
+def list_watchlist():
+    items = get_watchlist().entries()
+    return {"count": len(items), "items": [item.as_dict() for item in items]}
+
+
+@router.delete("/watchlist/{item_id}")
+def remove_from_watchlist(item_id: int):
+    if not get_watchlist().remove(item_id):
+        raise HTTPException(status_code=404, detail="Видео не найдено в watchlist")
+    return {"success": True}
+
+
+@router.get("/watchlist/{item_id}/history")
+def get_watchlist_history(item_id: int, since: int = Query(0, ge=0)):
+    watchlist = get_watchlist()
+    item = watchlist.get(item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Видео не найдено в watchlist")
+    return {"item": item.as_dict(), "history": watchlist.history(item_id, since)}
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import orjson
+
+from core.config import CACHE_BACKEND, CACHE_DIR
+
+
+class MemoryCache:
+    """Потокобезопасный LRU-кэш с жёстким TTL на запись (в пределах одного процесса)."""
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Записывает значение, только если ключа нет (или он истёк); используется как блокировка."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > self._clock():
+                return False
+            self._data[key] = (self._clock() + ttl, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCache:
+    """Кэш в общем SQLite-файле (WAL): одни и те же записи видят все воркеры на хосте.
+
+    Значения сериализуются в JSON, поэтому хранить можно только JSON-совместимые данные.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        value BLOB NOT NULL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS cache_expires ON cache (namespace, expires_at);
+    """
+    # Раз в сколько записей проверяем размер и вычищаем старые ключи
+    EVICT_EVERY = 256
+
+    def __init__(self, path: str, namespace: str, maxsize: int, clock: Callable[[], float] = time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, self._clock()),
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, expires_at, value) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, self._clock() + ttl, orjson.dumps(value)),
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                    (self.namespace, key, now),
+                )
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO cache (namespace, key, expires_at, value) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, now + ttl, orjson.dumps(value)),
+                ).rowcount
+            finally:
+                self._conn.execute("COMMIT")
+        return bool(inserted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def _evict(self) -> None:
+        self._conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, self._clock()))
+        self._conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key IN ("
+            "SELECT key FROM cache WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.maxsize),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+
+def create_cache(namespace: str, maxsize: int):
+    """Кэш по CACHE_BACKEND: "memory" — свой у каждого воркера, "sqlite" — общий для всех воркеров."""
+    if CACHE_BACKEND == "sqlite":
+        return SqliteCache(os.path.join(CACHE_DIR, "cache.sqlite3"), namespace, maxsize)
+    return MemoryCache(maxsize)
@@ -0,0 +1,170 @@
+import socket
+import threading
+import time
+from typing import Callable
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from core.config import DNS_CACHE_STALE_SECONDS, DNS_CACHE_TTL
+from services.metrics import CONNECT_SECONDS, record_timing, registry, upstream_label
+
+
+AddrInfo = tuple
+
+
+class DnsCache:
+    """Кэш getaddrinfo в процессе.
+
+    Системный резолвер не отдаёт TTL записи, поэтому запись живёт `ttl` секунд;
+    если резолв упал, ещё `stale_seconds` отдаём последний успешный ответ.
+    """
+
+    def __init__(self, ttl: float, stale_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        # (host, port, family) -> (expires_at, addresses)
+        self._entries: dict[tuple, tuple[float, list[AddrInfo]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(self, host: str, port: int, family: int = socket.AF_UNSPEC) -> list[AddrInfo]:
+        key = (host, port, family)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+        except socket.gaierror:
+            elapsed = time.perf_counter() - start
+            CONNECT_SECONDS.observe(elapsed, upstream_label(host), "dns", "error")
+            record_timing(f"dns {host}", "", elapsed, "error")
+            if entry is not None and entry[0] + self.stale_seconds > now:
+                return entry[1]
+            raise
+        elapsed = time.perf_counter() - start
+        CONNECT_SECONDS.observe(elapsed, upstream_label(host), "dns", "ok")
+        record_timing(f"dns {host}", "", elapsed, "ok")
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+dns_cache = DnsCache(DNS_CACHE_TTL, DNS_CACHE_STALE_SECONDS)
+registry.gauge("parser_dns_cache_entries", "Host names held in the in-process DNS cache.", lambda: len(dns_cache))
+
+
+def _observe_phase(phase: str, host: str, seconds: float, outcome: str) -> None:
+    CONNECT_SECONDS.observe(seconds, upstream_label(host), phase, outcome)
+    record_timing(f"{phase} {host}", "", seconds, outcome)
+
+
+class TimedConnectionMixin:
+    """Резолвит хост через dns_cache и замеряет этапы установки соединения по отдельности.
+
+    `last_used` — время последнего запроса или подключения; по нему ConnectionKeeper
+    решает, что соединение пора переоткрыть, пока сервер не закрыл его сам.
+    """
+
+    last_used: float = 0.0
+    _setup_seconds: float = 0.0
+    # Сокет (и CONNECT-туннель, если он нужен) установлен — дальше может начаться TLS
+    _socket_ready: bool = False
+
+    def _new_conn(self) -> socket.socket:
+        hostname = self._dns_host
+        try:
+            addresses = dns_cache.resolve(hostname.strip("[]"), self.port, allowed_gai_family())
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        start = time.perf_counter()
+        error = None
+        for address in addresses:
+            # Подключаемся по уже известному IP; SNI и заголовок Host берутся из self.host,
+            # поэтому подменяем _dns_host только на время подключения
+            self._dns_host = address[4][0]
+            try:
+                sock = super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+                continue
+            finally:
+                self._dns_host = hostname
+            self._observe_tcp(hostname, start, "ok")
+            self._socket_ready = True
+            return sock
+        self._observe_tcp(hostname, start, "error")
+        raise error or NewConnectionError(self, f"Failed to establish a new connection: no addresses for {hostname}")
+
+    def _observe_tcp(self, hostname: str, start: float, outcome: str) -> None:
+        elapsed = time.perf_counter() - start
+        self._setup_seconds += elapsed
+        _observe_phase("tcp", hostname, elapsed, outcome)
+
+    def _tunnel(self) -> None:
+        self._socket_ready = False
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            super()._tunnel()
+            outcome = "ok"
+            self._socket_ready = True
+        finally:
+            elapsed = time.perf_counter() - start
+            self._setup_seconds += elapsed
+            _observe_phase("tunnel", self.host, elapsed, outcome)
+
+    def connect(self) -> None:
+        self._setup_seconds = 0.0
+        self._socket_ready = False
+        super().connect()
+        self.last_used = time.monotonic()
+
+    def request(self, *args, **kwargs):
+        self.last_used = time.monotonic()
+        return super().request(*args, **kwargs)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        self._setup_seconds = 0.0
+        self._socket_ready = False
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            HTTPSConnection.connect(self)
+            outcome = "ok"
+        finally:
+            # Ошибка DNS/TCP/туннеля — не ошибка TLS: рукопожатие даже не начиналось
+            if self._socket_ready:
+                # Всё, что не ушло на TCP и CONNECT-туннель, — TLS-рукопожатие
+                elapsed = time.perf_counter() - start - self._setup_seconds
+                _observe_phase("tls", self._tunnel_host or self.host, max(elapsed, 0.0), outcome)
+        self.last_used = time.monotonic()
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+POOL_CLASSES_BY_SCHEME = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
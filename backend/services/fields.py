@@ -0,0 +1,57 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+
+# Все поля, которые может вернуть /parse (платформенные присутствуют только для своей платформы)
+PARSE_FIELDS = frozenset({
+    "title", "author", "views", "likes", "comment_count", "thumbnail", "thumbnail_proxy", "description", "comments", "url",
+    "platform", "video_id", "channel_id", "upload_date", "duration", "tags", "category_id",
+    "post_id", "author_id", "shares", "downloads",
+})
+
+FIELD_PRESETS: dict[str, frozenset] = {
+    "compact": frozenset({"title", "author", "views", "likes", "comment_count", "thumbnail", "thumbnail_proxy", "url", "platform"}),
+}
+
+# Какие части videos.list нужны для каждого поля YouTube
+YOUTUBE_PARTS_BY_FIELD = {
+    "views": "statistics",
+    "likes": "statistics",
+    "comment_count": "statistics",
+    "duration": "contentDetails",
+}
+YOUTUBE_ALL_PARTS = ("snippet", "statistics", "contentDetails")
+
+
+def parse_fields(fields: str) -> Optional[frozenset]:
+    """Разбирает `fields=title,views` или пресет (`compact`); None — вернуть все поля."""
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names:
+        return None
+    selected: set[str] = set()
+    for name in names:
+        if name in FIELD_PRESETS:
+            selected |= FIELD_PRESETS[name]
+        elif name in PARSE_FIELDS:
+            selected.add(name)
+        else:
+            raise HTTPException(status_code=400, detail=f"Неизвестное поле: {name}")
+    return frozenset(selected)
+
+
+def wants(fields: Optional[frozenset], name: str) -> bool:
+    return fields is None or name in fields
+
+
+def youtube_parts(fields: Optional[frozenset]) -> tuple[str, ...]:
+    if fields is None:
+        return YOUTUBE_ALL_PARTS
+    parts = {YOUTUBE_PARTS_BY_FIELD.get(name, "snippet") for name in fields - {"url", "platform", "video_id"}}
+    return tuple(part for part in YOUTUBE_ALL_PARTS if part in parts) or ("statistics",)
+
+
+def select_fields(result: dict, fields: Optional[frozenset]) -> dict:
+    if fields is None:
+        return result
+    return {key: value for key, value in result.items() if key in fields}
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Iterator
+
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.util.proxy import connection_requires_http_tunnel
+
+from services.proxy_pool import ProxyPool, proxy_dict, proxy_pool
+from services.utils import get_shared_session
+
+
+WARM_CONNECT_TIMEOUT = 10
+
+
+class ConnectionKeeper:
+    """Держит в пулах общих сессий (get_shared_session) установленные TCP+TLS соединения к горячим хостам.
+
+    Для каждого хоста и каждого прокси, через который может пойти запрос платформы,
+    в пуле лежит до `per_host` готовых соединений. Соединение, простаивающее дольше
+    `max_idle`, переоткрывается до того, как его закроет сервер.
+    """
+
+    def __init__(self, hosts: dict[str, str], per_host: int, max_idle: float, pool: ProxyPool = proxy_pool):
+        self.hosts = hosts
+        self.per_host = per_host
+        self.max_idle = max_idle
+        self.pool = pool
+
+    def _targets(self) -> Iterator[HTTPConnectionPool]:
+        for host, platform in self.hosts.items():
+            url = f"https://{host}/"
+            adapter = get_shared_session(platform).get_adapter(url)
+            for proxy in self.pool.candidates(platform) or [None]:
+                conn_pool = adapter.get_connection(url, proxy_dict(proxy))
+                # Те же настройки проверки сертификата, что requests выставит пулу перед запросом
+                adapter.cert_verify(conn_pool, url, True, None)
+                yield conn_pool
+
+    def refresh(self) -> dict[str, int]:
+        stats = {"opened": 0, "kept": 0, "failed": 0}
+        for conn_pool in self._targets():
+            for outcome in self._refresh_pool(conn_pool):
+                stats[outcome] += 1
+        return stats
+
+    def _refresh_pool(self, conn_pool: HTTPConnectionPool) -> list[str]:
+        # _get_conn/_put_conn — внутренний API urllib3, но другого способа положить
+        # установленное соединение в пул без запроса нет
+        conns = [conn_pool._get_conn() for _ in range(self.per_host)]
+        outcomes = []
+        try:
+            now = time.monotonic()
+            for conn in conns:
+                if conn.sock is not None and now - getattr(conn, "last_used", 0.0) < self.max_idle:
+                    outcomes.append("kept")
+                    continue
+                conn.close()
+                conn.timeout = WARM_CONNECT_TIMEOUT
+                try:
+                    if conn_pool.proxy is not None and connection_requires_http_tunnel(
+                        conn_pool.proxy, conn_pool.proxy_config, conn_pool.scheme
+                    ):
+                        conn_pool._prepare_proxy(conn)
+                    else:
+                        conn.connect()
+                    outcomes.append("opened")
+                except Exception:
+                    conn.close()
+                    outcomes.append("failed")
+        finally:
+            # Очередь пула — LIFO: возвращаем в обратном порядке, чтобы не перемешать её
+            for conn in reversed(conns):
+                conn_pool._put_conn(conn)
+        return outcomes
+
+
+async def run_keeper(keeper: ConnectionKeeper, interval: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(keeper.refresh)
+        except Exception:
+            pass
+        await asyncio.sleep(interval)
@@ -7,7 +7,9 @@ from typing import Optional
 import requests
 from fastapi import HTTPException
 
-from services.utils import create_robust_session
+from core.config import LIKEE_DELAY_SCALE
+from services.metrics import span
+from services.utils import get_shared_session
 
 
 def is_likee_url(url: str) -> bool:
@@ -235,11 +237,10 @@ def parse_likee_api_response(data, video_id: str) -> Optional[dict]:
 
 def extract_likee_via_mobile_request(url: str) -> Optional[dict]:
     try:
-        session = create_robust_session()
+        session = get_shared_session("likee")
         headers = get_mobile_headers()
-        session.headers.update(headers)
-        time.sleep(random.uniform(1, 3))
-        response = session.get(url, allow_redirects=True, timeout=30)
+        time.sleep(random.uniform(1, 3) * LIKEE_DELAY_SCALE)
+        response = session.get(url, headers=headers, allow_redirects=True, timeout=30)
         final_url_lower = response.url.lower()
         if (
             any(keyword in final_url_lower for keyword in ['trending', 'm_index', '/home'])
@@ -323,11 +324,11 @@ def extract_likee_via_api(url: str) -> Optional[dict]:
             f"https://api.likee.video/rest/n/video/info?postId={video_id}",
             f"https://likee.video/rest/n/video/info?postId={video_id}",
         ]
-        session = create_robust_session()
+        session = get_shared_session("likee")
         for headers in headers_variants:
             for api_url in api_endpoints:
                 try:
-                    time.sleep(random.uniform(0.5, 2.0))
+                    time.sleep(random.uniform(0.5, 2.0) * LIKEE_DELAY_SCALE)
                     response = session.get(api_url, headers=headers, timeout=15)
                     if response.status_code == 200:
                         try:
@@ -346,9 +347,14 @@ def extract_likee_via_api(url: str) -> Optional[dict]:
 
 
 def resolve_likee_url(url: str) -> str:
+    with span("likee.resolve", "likee"):
+        return _resolve_likee_url(url)
+
+
+def _resolve_likee_url(url: str) -> str:
     try:
         headers = get_mobile_headers()
-        session = create_robust_session()
+        session = get_shared_session("likee")
         response = session.head(url, headers=headers, allow_redirects=True, timeout=30)
         final_url = response.url
         final_url_lower = final_url.lower()
@@ -373,20 +379,21 @@ def extract_likee_info(url: str) -> Optional[dict]:
     if not url.startswith('http'):
         url = 'https://' + url
     methods = [
-        ("Mobile Request", extract_likee_via_mobile_request),
-        ("API Request", extract_likee_via_api),
+        ("mobile_request", extract_likee_via_mobile_request),
+        ("api_request", extract_likee_via_api),
     ]
-    for _, method_func in methods:
-        try:
-            result = method_func(url)
-            if result and result.get('video_url'):
-                video_url = result['video_url']
-                if video_url and ('http' in video_url and ('mp4' in video_url or 'video' in video_url)):
-                    return result
-                else:
-                    continue
-        except Exception:
-            continue
+    for name, method_func in methods:
+        with span(f"likee.{name}", "likee") as stage:
+            try:
+                result = method_func(url)
+                if result and result.get('video_url'):
+                    video_url = result['video_url']
+                    if video_url and ('http' in video_url and ('mp4' in video_url or 'video' in video_url)):
+                        return result
+            except Exception:
+                stage.outcome = "error"
+                continue
+            stage.outcome = "miss"
     return None
 
 
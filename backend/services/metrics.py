@@ -0,0 +1,216 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+GaugeSample = tuple[dict, float]
+GaugeCallback = Callable[[], Union[float, Iterable[GaugeSample]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [счётчики по корзинам (последняя — +Inf), сумма]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """Gauge, значение которого вычисляется в момент сбора метрик."""
+
+    def __init__(self, name: str, help_text: str, callback: GaugeCallback):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        try:
+            value = self.callback()
+        except Exception:
+            return
+        samples = [({}, value)] if isinstance(value, (int, float)) else value
+        for labels, sample in samples:
+            names = tuple(labels)
+            yield f"{self.name}{_format_labels(names, tuple(labels[name] for name in names))} {_format_value(sample)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Union[Histogram, Gauge]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help_text, labelnames, buckets)
+            return metric
+
+    def gauge(self, name: str, help_text: str, callback: GaugeCallback) -> Gauge:
+        with self._lock:
+            metric = self._metrics[name] = Gauge(name, help_text, callback)
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# Домены (и их поддомены) платформ для метки upstream. Хост напрямую в метку не идёт:
+# превью с произвольных og:image, шарды CDN и IP прокси дали бы неограниченное число рядов
+UPSTREAM_DOMAINS = {
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "googleapis.com": "youtube",
+    "ytimg.com": "youtube",
+    "googlevideo.com": "youtube",
+    "likee.video": "likee",
+    "likee.com": "likee",
+    "like.video": "likee",
+    "vk.com": "vk",
+    "vk.ru": "vk",
+    "vkvideo.ru": "vk",
+    "userapi.com": "vk",
+    "vkuser.net": "vk",
+    "tiktok.com": "tiktok",
+    "tiktokv.com": "tiktok",
+    "tiktokcdn.com": "tiktok",
+    "instagram.com": "instagram",
+    "cdninstagram.com": "instagram",
+    "fbcdn.net": "instagram",
+}
+
+
+def upstream_label(host: str) -> str:
+    """Платформа, которой принадлежит хост, или "other"."""
+    labels = host.lower().rstrip(".").split(".")
+    for i in range(len(labels) - 1):
+        platform = UPSTREAM_DOMAINS.get(".".join(labels[i:]))
+        if platform:
+            return platform
+    return "other"
+
+
+STAGE_SECONDS = registry.histogram(
+    "parser_stage_seconds",
+    "Duration of extraction stages (Likee strategies, yt-dlp, YouTube API, disk writes).",
+    ("stage", "platform", "outcome"),
+)
+HTTP_SECONDS = registry.histogram(
+    "parser_http_request_seconds",
+    "Duration of outbound HTTP requests until response headers.",
+    ("upstream", "proxied", "outcome"),
+)
+CONNECT_SECONDS = registry.histogram(
+    "parser_connect_seconds",
+    "Duration of outbound connection setup phases (dns, tcp, tunnel, tls).",
+    ("upstream", "phase", "outcome"),
+)
+REQUEST_SECONDS = registry.histogram(
+    "parser_request_seconds",
+    "Duration of handled API requests.",
+    ("route", "method", "status"),
+)
+
+
+# Разбивка времени текущего запроса по этапам (включается заголовком X-Debug-Timings)
+_timings: ContextVar[Optional[list]] = ContextVar("parser_timings", default=None)
+
+
+@contextmanager
+def collect_timings(enabled: bool = True) -> Iterator[Optional[list]]:
+    if not enabled:
+        yield None
+        return
+    timings: list = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def record_timing(stage: str, platform: str, seconds: float, outcome: str) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.append({"stage": stage, "platform": platform, "ms": round(seconds * 1000, 2), "outcome": outcome})
+
+
+class span:
+    """Замеряет этап; код внутри может выставить `outcome` (например, "miss" для пустого результата)."""
+
+    __slots__ = ("stage", "platform", "outcome", "_start")
+
+    def __init__(self, stage: str, platform: str = ""):
+        self.stage = stage
+        self.platform = platform
+        self.outcome = "ok"
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.outcome = "error"
+        elapsed = time.perf_counter() - self._start
+        STAGE_SECONDS.observe(elapsed, self.stage, self.platform, self.outcome)
+        record_timing(self.stage, self.platform, elapsed, self.outcome)
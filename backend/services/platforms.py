@@ -0,0 +1,23 @@
+from services.utils import is_youtube_url
+from services.likee import is_likee_url
+from services.vk import is_vk_url
+from services.tiktok import is_tiktok_url
+from services.instagram import is_instagram_url
+
+
+# Значения, которые может вернуть detect_platform
+PLATFORMS = ("youtube", "likee", "vk", "tiktok", "instagram", "other")
+
+
+def detect_platform(url: str) -> str:
+    if is_youtube_url(url):
+        return "youtube"
+    if is_likee_url(url):
+        return "likee"
+    if is_vk_url(url):
+        return "vk"
+    if is_tiktok_url(url):
+        return "tiktok"
+    if is_instagram_url(url):
+        return "instagram"
+    return "other"
@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_ARM_TIMEOUT = 600.0
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Сэмплирующий профайлер: фоновый поток периодически снимает стеки через sys._current_frames().
+
+    Результат — collapsed stacks (`frame;frame;frame count`), формат flamegraph.pl/speedscope.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_ids: Optional[set[int]] = None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                thread_name = names.get(thread_id, str(thread_id)).replace(";", "_")
+                self.stacks[f"{thread_name};{_collapse(frame)}"] += 1
+            self.samples += 1
+
+
+def render_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class RequestProfiling:
+    """Профилирование следующих K запросов /parse для выбранной платформы.
+
+    Через `timeout` секунд сеанс истекает, даже если K запросов так и не пришло,
+    и перестаёт блокировать другие сеансы профилирования.
+    """
+
+    def __init__(self, platform: str, count: int, interval: float, timeout: float):
+        self.platform = platform
+        self.count = count
+        self.interval = interval
+        self.captured = 0
+        self.stacks: Counter[str] = Counter()
+        self.started_at = time.time()
+        self.expires_at = self.started_at + timeout
+
+    @property
+    def done(self) -> bool:
+        return self.captured >= self.count
+
+    @property
+    def expired(self) -> bool:
+        return not self.done and time.time() >= self.expires_at
+
+    @property
+    def active(self) -> bool:
+        return not self.done and not self.expired
+
+    def as_dict(self) -> dict:
+        return {
+            "platform": self.platform,
+            "count": self.count,
+            "captured": self.captured,
+            "done": self.done,
+            "expired": self.expired,
+            "started_at": self.started_at,
+            "expires_at": self.expires_at,
+        }
+
+
+class ProfilerController:
+    """Допускает только один сеанс профилирования на воркер, чтобы ограничить накладные расходы."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._busy = False
+        self.requests: Optional[RequestProfiling] = None
+        self._in_flight = 0
+
+    def profile_for(self, seconds: float, interval: float = DEFAULT_INTERVAL) -> tuple[str, int]:
+        with self._lock:
+            if self._busy or (self.requests and self.requests.active):
+                raise ProfilerBusy()
+            self._busy = True
+        try:
+            profiler = SamplingProfiler(interval).start()
+            time.sleep(seconds)
+            stacks = profiler.stop()
+            return render_collapsed(stacks), profiler.samples
+        finally:
+            with self._lock:
+                self._busy = False
+
+    def arm_requests(self, platform: str, count: int, interval: float = DEFAULT_INTERVAL,
+                     timeout: float = DEFAULT_ARM_TIMEOUT) -> RequestProfiling:
+        with self._lock:
+            if self._busy or (self.requests and self.requests.active):
+                raise ProfilerBusy()
+            self.requests = RequestProfiling(platform, count, interval, timeout)
+            return self.requests
+
+    def cancel_requests(self) -> Optional[RequestProfiling]:
+        """Снимает сеанс профилирования запросов; уже идущие замеры в него не попадут."""
+        with self._lock:
+            session, self.requests = self.requests, None
+            return session
+
+    def _claim(self, platform: str) -> Optional[RequestProfiling]:
+        with self._lock:
+            session = self.requests
+            if (
+                session is None
+                or session.platform != platform
+                or session.expired
+                or session.captured + self._in_flight >= session.count
+            ):
+                return None
+            self._in_flight += 1
+            return session
+
+    @contextmanager
+    def _capture(self, session: RequestProfiling) -> Iterator[None]:
+        profiler = SamplingProfiler(session.interval, {threading.get_ident()}).start()
+        try:
+            yield
+        finally:
+            stacks = profiler.stop()
+            with self._lock:
+                self._in_flight -= 1
+                if self.requests is session:
+                    session.stacks.update(stacks)
+                    session.captured += 1
+
+    def capture(self, platform: str):
+        session = self._claim(platform)
+        return self._capture(session) if session else nullcontext()
+
+
+profiler_controller = ProfilerController()
@@ -0,0 +1,240 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from core.config import (
+    PROXY_URLS,
+    PROXY_PINS,
+    PROXY_EJECT_ERRORS,
+    PROXY_EJECT_ERROR_RATE,
+    PROXY_EJECT_SECONDS,
+    PROXY_PROBE_URL,
+)
+from services.metrics import registry
+
+
+# Начальная оценка задержки для прокси без истории: новые прокси сразу получают трафик
+DEFAULT_LATENCY = 1.0
+EWMA_ALPHA = 0.3
+# Сколько запросов нужно, прежде чем доля ошибок начнёт выбрасывать прокси из пула
+MIN_SAMPLES_FOR_RATE = 5
+
+
+def redact_proxy(url: str) -> str:
+    """scheme://user@host:port без пароля — для /health и меток метрик.
+
+    Логин оставляем: у прокси с ротацией сессий один шлюз host:port, и
+    различаются записи только им.
+    """
+    parts = urlsplit(url)
+    netloc = parts.hostname or ""
+    if ":" in netloc:
+        netloc = f"[{netloc}]"
+    if parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    return f"{parts.scheme}://{netloc}" if parts.scheme else netloc
+
+
+class ProxyStats:
+    def __init__(self, url: str, index: int):
+        self.url = url
+        # Порядковый номер в PROXY_URLS — стабильный идентификатор, даже если
+        # после скрытия пароля два адреса совпали
+        self.index = index
+        self.latency = DEFAULT_LATENCY
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.probing = False
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def weight(self) -> float:
+        return 1.0 / (max(self.latency, 0.001) * (1.0 + 4.0 * self.error_rate))
+
+    def as_dict(self, now: float) -> dict:
+        return {
+            "id": self.index,
+            "url": redact_proxy(self.url),
+            "latency": round(self.latency, 4),
+            "error_rate": round(self.error_rate, 4),
+            "samples": self.samples,
+            "healthy": not self.is_ejected(now) and not self.probing,
+            "ejected_for": max(0.0, round(self.ejected_until - now, 1)),
+        }
+
+
+class ProxyPool:
+    """Пул исходящих прокси: выбор по взвешенной минимальной задержке,
+    выбрасывание нездоровых прокси и возврат через пробный запрос."""
+
+    def __init__(
+        self,
+        proxies: list[str],
+        pins: Optional[dict[str, str]] = None,
+        eject_errors: int = PROXY_EJECT_ERRORS,
+        eject_error_rate: float = PROXY_EJECT_ERROR_RATE,
+        eject_seconds: float = PROXY_EJECT_SECONDS,
+        probe_url: str = PROXY_PROBE_URL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._stats = {url: ProxyStats(url, index) for index, url in enumerate(dict.fromkeys(proxies))}
+        self.pins = {platform: url for platform, url in (pins or {}).items() if url in self._stats}
+        self.eject_errors = eject_errors
+        self.eject_error_rate = eject_error_rate
+        self.eject_seconds = eject_seconds
+        self.probe_url = probe_url
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._stats)
+
+    def pick(self, platform: Optional[str] = None) -> Optional[str]:
+        if not self._stats:
+            return None
+        with self._lock:
+            now = self._clock()
+            pinned = self._stats.get(self.pins.get(platform or "", ""))
+            if pinned and self._available(pinned, now):
+                return self._take(pinned, now)
+            candidates = [s for s in self._stats.values() if self._available(s, now)]
+            if not candidates:
+                # Все прокси выброшены: лучше попробовать тот, что вернётся раньше всех, чем упасть
+                return min(self._stats.values(), key=lambda s: s.ejected_until).url
+            chosen = random.choices(candidates, weights=[s.weight() for s in candidates])[0]
+            return self._take(chosen, now)
+
+    def candidates(self, platform: Optional[str] = None) -> list[str]:
+        """Прокси, через которые сейчас могут пойти запросы платформы (без учёта весов)."""
+        with self._lock:
+            now = self._clock()
+            pinned = self._stats.get(self.pins.get(platform or "", ""))
+            if pinned and self._available(pinned, now):
+                return [pinned.url]
+            return [s.url for s in self._stats.values() if self._available(s, now)]
+
+    def _available(self, stats: ProxyStats, now: float) -> bool:
+        return not stats.is_ejected(now) and not stats.probing
+
+    def _take(self, stats: ProxyStats, now: float) -> str:
+        # После выбрасывания первый запрос к прокси — пробный, остальные ждут его результата
+        if stats.ejected_until:
+            stats.probing = True
+        return stats.url
+
+    def record(self, proxy: Optional[str], latency: Optional[float], ok: bool) -> None:
+        if not proxy:
+            return
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+            now = self._clock()
+            stats.samples += 1
+            stats.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - stats.error_rate)
+            if ok:
+                if latency is not None:
+                    stats.latency += EWMA_ALPHA * (latency - stats.latency)
+                stats.consecutive_errors = 0
+                if stats.probing:
+                    stats.ejected_until = 0.0
+                    stats.error_rate = 0.0
+                stats.probing = False
+                return
+            stats.consecutive_errors += 1
+            failing = (
+                stats.probing
+                or stats.consecutive_errors >= self.eject_errors
+                or (stats.samples >= MIN_SAMPLES_FOR_RATE and stats.error_rate >= self.eject_error_rate)
+            )
+            stats.probing = False
+            if failing:
+                stats.ejected_until = now + self.eject_seconds
+
+    @contextmanager
+    def lease(
+        self,
+        platform: Optional[str] = None,
+        is_proxy_error: Callable[[BaseException], bool] = lambda exc: True,
+        measure_latency: bool = True,
+    ) -> Iterator[Optional[str]]:
+        """Прокси на время блока. measure_latency=False — учитывать только успех/ошибку:
+        длительность блока (например, скачивание yt-dlp) не говорит о задержке прокси."""
+        proxy = self.pick(platform)
+        start = time.perf_counter()
+        try:
+            yield proxy
+        except BaseException as exc:
+            self.record(proxy, time.perf_counter() - start if measure_latency else None, not is_proxy_error(exc))
+            raise
+        self.record(proxy, time.perf_counter() - start if measure_latency else None, True)
+
+    def probe(self, proxy: str, timeout: float = 10) -> bool:
+        start = time.perf_counter()
+        try:
+            response = requests.get(
+                self.probe_url,
+                proxies=proxy_dict(proxy),
+                timeout=timeout,
+                allow_redirects=False,
+            )
+            ok = response.status_code < 500 and response.status_code != 407
+        except requests.RequestException:
+            ok = False
+        self.record(proxy, time.perf_counter() - start, ok)
+        return ok
+
+    def probe_ejected(self) -> dict[str, bool]:
+        """Проверяет выброшенные прокси, у которых истёк таймаут; вызывается фоновой задачей."""
+        with self._lock:
+            now = self._clock()
+            due = [s for s in self._stats.values() if s.ejected_until and not s.is_ejected(now) and not s.probing]
+            for stats in due:
+                stats.probing = True
+        return {stats.url: self.probe(stats.url) for stats in due}
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            now = self._clock()
+            return [stats.as_dict(now) for stats in self._stats.values()]
+
+
+def proxy_dict(proxy: Optional[str]) -> dict:
+    if not proxy:
+        return {}
+    return {"http": proxy, "https": proxy}
+
+
+proxy_pool = ProxyPool(PROXY_URLS, PROXY_PINS)
+
+
+def _pool_gauge(key: str):
+    def collect():
+        return [
+            ({"id": str(item["id"]), "proxy": item["url"]}, float(item[key]))
+            for item in proxy_pool.snapshot()
+        ]
+    return collect
+
+
+registry.gauge("parser_proxy_healthy", "Whether an outbound proxy is currently in rotation.", _pool_gauge("healthy"))
+registry.gauge("parser_proxy_latency_seconds", "EWMA latency of an outbound proxy.", _pool_gauge("latency"))
+registry.gauge("parser_proxy_error_rate", "EWMA error rate of an outbound proxy.", _pool_gauge("error_rate"))
+
+
+async def run_prober(pool: ProxyPool, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if pool:
+            await asyncio.to_thread(pool.probe_ejected)
@@ -0,0 +1,42 @@
+import threading
+import time
+from typing import Optional
+
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"
+
+
+class Readiness:
+    """Состояние готовности подсистем воркера для /health."""
+
+    def __init__(self):
+        self._states: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+
+    def set(self, name: str, state: str, detail: Optional[str] = None) -> None:
+        with self._lock:
+            entry = {"state": state, "since_start_s": round(time.monotonic() - self.started_at, 3)}
+            if detail:
+                entry["detail"] = detail
+            self._states[name] = entry
+
+    def state(self, name: str) -> Optional[str]:
+        with self._lock:
+            entry = self._states.get(name)
+            return entry["state"] if entry else None
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._states.items()}
+
+    def all_ready(self) -> bool:
+        with self._lock:
+            return all(entry["state"] in (READY, DISABLED) for entry in self._states.values())
+
+
+readiness = Readiness()
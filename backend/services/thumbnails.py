@@ -0,0 +1,180 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import requests
+from fastapi import HTTPException
+
+from core.config import (
+    THUMB_CACHE_DIR,
+    THUMB_CACHE_MAX_BYTES,
+    THUMB_MAX_SOURCE_BYTES,
+    THUMB_KEY_TTL,
+)
+from services.cache import create_cache
+from services.metrics import registry, span
+from services.utils import get_shared_session
+
+
+THUMB_WIDTHS = (160, 320, 480, 640, 1280)
+THUMB_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+THUMB_QUALITY = 80
+# После переполнения чистим кэш до этой доли лимита, чтобы не вычищать на каждой записи
+EVICT_TO_RATIO = 0.9
+
+# key -> исходный URL; регистрируется в /parse, поэтому /thumb не проксирует произвольные адреса
+thumb_keys = create_cache("thumbnails", 1_000_000)
+
+
+def thumb_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+
+def register_thumbnail(url: str) -> str:
+    key = thumb_key(url)
+    thumb_keys.set(key, url, THUMB_KEY_TTL)
+    return key
+
+
+class ThumbnailCache:
+    """Ограниченный по размеру дисковый кэш превью: оригинал и уменьшенные варианты.
+
+    Вытеснение — по времени последнего обращения (mtime обновляется при чтении).
+    Параллельные запросы одного и того же файла объединяются: качает и
+    перекодирует только первый, остальные ждут его результата.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, threading.Event] = {}
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get_or_create(self, name: str, produce) -> str:
+        path = self.path(name)
+        while True:
+            if os.path.exists(path):
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+            with self._lock:
+                event = self._in_flight.get(name)
+                if event is None:
+                    event = self._in_flight[name] = threading.Event()
+                    leader = True
+                else:
+                    leader = False
+            if not leader:
+                event.wait()
+                if not os.path.exists(path):
+                    # Первый запрос завершился ошибкой: пробуем сами
+                    continue
+                return path
+            try:
+                self._write(path, produce())
+                return path
+            finally:
+                with self._lock:
+                    self._in_flight.pop(name, None)
+                event.set()
+
+    def _write(self, path: str, data: bytes) -> None:
+        with span("disk.write", "thumbnails"):
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        with self._lock:
+            self._size += len(data)
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO_RATIO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                continue
+        with self._lock:
+            self._size = total
+
+
+thumbnail_cache = ThumbnailCache(THUMB_CACHE_DIR, THUMB_CACHE_MAX_BYTES)
+registry.gauge("parser_thumbnail_cache_bytes", "Bytes stored in the on-disk thumbnail cache.", lambda: thumbnail_cache.size)
+
+
+def _fetch_original(url: str) -> bytes:
+    with span("thumb.fetch", "thumbnails"):
+        try:
+            response = get_shared_session("thumbnails").get(url, timeout=15, stream=True)
+        except requests.RequestException as e:
+            raise HTTPException(status_code=502, detail=f"Не удалось загрузить превью: {str(e)}")
+        with response:
+            if response.status_code != 200:
+                raise HTTPException(status_code=502, detail=f"Источник превью ответил HTTP {response.status_code}")
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                received += len(chunk)
+                if received > THUMB_MAX_SOURCE_BYTES:
+                    raise HTTPException(status_code=502, detail="Превью слишком большое")
+                chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _resize(source_path: str, width: int, fmt: str) -> bytes:
+    from PIL import Image
+
+    with span("thumb.resize", "thumbnails"), Image.open(source_path) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format=fmt.upper(), quality=THUMB_QUALITY, optimize=fmt == "jpeg")
+        return output.getvalue()
+
+
+def get_thumbnail(key: str, width: int, fmt: str) -> tuple[str, str]:
+    """Возвращает путь к варианту превью и его MIME-тип, скачивая и уменьшая при необходимости."""
+    url: Optional[str] = thumb_keys.get(key)
+    if not url:
+        raise HTTPException(status_code=404, detail="Превью не найдено")
+    original = thumbnail_cache.get_or_create(f"{key}.orig", lambda: _fetch_original(url))
+    try:
+        variant = thumbnail_cache.get_or_create(f"{key}.{width}.{fmt}", lambda: _resize(original, width, fmt))
+    except OSError as e:
+        raise HTTPException(status_code=502, detail=f"Не удалось обработать превью: {str(e)}")
+    return variant, THUMB_FORMATS[fmt]
@@ -0,0 +1,57 @@
+import sqlite3
+from typing import Optional
+
+
+Counters = tuple[int, int, int]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    item_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    d_views INTEGER NOT NULL,
+    d_likes INTEGER NOT NULL,
+    d_comments INTEGER NOT NULL,
+    PRIMARY KEY (item_id, ts)
+) WITHOUT ROWID;
+"""
+
+
+class DeltaSeries:
+    """Временной ряд счётчиков, хранящий только изменения.
+
+    Первая точка ряда — абсолютные значения (дельта от нуля), дальше пишутся
+    только ненулевые изменения; история восстанавливается накопительной суммой.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        conn.executescript(SCHEMA)
+
+    def append(self, item_id: int, ts: int, previous: Optional[Counters], current: Counters) -> bool:
+        base = previous or (0, 0, 0)
+        delta = tuple(now - before for now, before in zip(current, base))
+        if previous is not None and not any(delta):
+            return False
+        self.conn.execute(
+            "INSERT OR REPLACE INTO samples (item_id, ts, d_views, d_likes, d_comments) VALUES (?, ?, ?, ?, ?)",
+            (item_id, ts, *delta),
+        )
+        return True
+
+    def history(self, item_id: int, since: int = 0) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT ts, d_views, d_likes, d_comments FROM samples WHERE item_id = ? ORDER BY ts",
+            (item_id,),
+        )
+        views = likes = comments = 0
+        points = []
+        for ts, d_views, d_likes, d_comments in rows:
+            views += d_views
+            likes += d_likes
+            comments += d_comments
+            if ts >= since:
+                points.append({"ts": ts, "views": views, "likes": likes, "comments": comments})
+        return points
+
+    def delete(self, item_id: int) -> None:
+        self.conn.execute("DELETE FROM samples WHERE item_id = ?", (item_id,))
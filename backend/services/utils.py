@@ -1,10 +1,18 @@
 import re
+from http.cookiejar import DefaultCookiePolicy
 import tempfile
+import time
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urlsplit
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from core.config import PROXY_URL
+
+from services.connections import POOL_CLASSES_BY_SCHEME
+from services.metrics import HTTP_SECONDS, record_timing, upstream_label
+from services.proxy_pool import ProxyPool, proxy_pool, proxy_dict
 
 def is_youtube_url(url: str) -> bool:
     if not url:
@@ -64,17 +72,83 @@ def create_cookies_file(sessionid: str, csrftoken: str, ds_user_id: str) -> str:
     return temp_file.name
 
 
-def create_robust_session() -> requests.Session:
+# Ответы, которые говорят о проблеме выходного IP/прокси, а не о самом видео
+PROXY_ERROR_STATUSES = {407, 429}
+# Ошибки самого прокси или подключения через него. RetryError после 5xx от источника
+# и ReadTimeout медленного источника прокси не выбрасывают: он свою работу сделал
+PROXY_EXCEPTIONS = (requests.exceptions.ProxyError, requests.exceptions.ConnectTimeout)
+
+
+class ProxyPoolAdapter(HTTPAdapter):
+    """HTTPAdapter, который берёт прокси из пула на каждый запрос и сообщает пулу задержку и ошибки."""
+
+    def __init__(self, pool: ProxyPool, platform: Optional[str] = None, **kwargs):
+        self.pool = pool
+        self.platform = platform
+        super().__init__(**kwargs)
+
+    # Пулы с кэшем DNS и раздельным замером TCP/TLS (services.connections)
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = POOL_CLASSES_BY_SCHEME
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = POOL_CLASSES_BY_SCHEME
+        return manager
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        proxy = self.pool.pick(self.platform)
+        if proxy:
+            proxies = {**(proxies or {}), **proxy_dict(proxy)}
+        host = urlsplit(request.url).hostname or ""
+        proxied = "yes" if proxy else "no"
+        start = time.perf_counter()
+        try:
+            response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        except requests.RequestException as exc:
+            elapsed = time.perf_counter() - start
+            # В elapsed ретраи и ожидание источника — это не задержка прокси
+            self.pool.record(proxy, None, not isinstance(exc, PROXY_EXCEPTIONS))
+            HTTP_SECONDS.observe(elapsed, upstream_label(host), proxied, "error")
+            record_timing(f"http {host}", self.platform or "", elapsed, "error")
+            raise
+        elapsed = time.perf_counter() - start
+        self.pool.record(proxy, elapsed, response.status_code not in PROXY_ERROR_STATUSES)
+        HTTP_SECONDS.observe(elapsed, upstream_label(host), proxied, str(response.status_code))
+        record_timing(f"http {host}", self.platform or "", elapsed, str(response.status_code))
+        return response
+
+
+def create_robust_session(platform: Optional[str] = None, pool: Optional[ProxyPool] = None,
+                          pool_maxsize: int = 10) -> requests.Session:
     session = requests.Session()
     retry_strategy = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = ProxyPoolAdapter(
+        pool if pool is not None else proxy_pool,
+        platform,
+        max_retries=retry_strategy,
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+    )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
-    if PROXY_URL:
-        session.proxies.update({
-            "http": PROXY_URL,
-            "https": PROXY_URL,
-        })
     return session
 
 
+class _RejectAllCookies(DefaultCookiePolicy):
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+
+@lru_cache(maxsize=None)
+def get_shared_session(platform: Optional[str] = None) -> requests.Session:
+    """Долгоживущая сессия на платформу: соединения (TCP/TLS) переиспользуются между запросами.
+
+    Куки в ней не сохраняются: иначе антибот- и региональные куки одного запроса
+    уходили бы во все следующие. Внутри одного запроса (редиректы) куки работают как обычно.
+    """
+    session = create_robust_session(platform, pool_maxsize=32)
+    session.cookies.set_policy(_RejectAllCookies())
+    return session
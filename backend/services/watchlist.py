@@ -0,0 +1,281 @@
+import asyncio
+import fcntl
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from core.config import (
+    YOUTUBE_API_KEY,
+    WATCHLIST_DB,
+    WATCHLIST_MIN_INTERVAL,
+    WATCHLIST_MAX_INTERVAL,
+    WATCHLIST_BATCH_LIMIT,
+    WATCHLIST_CONCURRENCY,
+)
+from services.metrics import registry
+from services.likee import extract_likee_info, extract_video_id_from_likee_url, parse_short_number
+from services.platforms import detect_platform
+from services.timeseries import Counters, DeltaSeries
+from services.utils import extract_video_id_from_url
+from services.youtube import get_youtube_statistics_batch
+from services.ytdlp import build_ydl_opts, extract_metadata, open_ydl
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watch_items (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    platform TEXT NOT NULL,
+    video_id TEXT,
+    interval REAL NOT NULL,
+    next_due REAL NOT NULL,
+    views INTEGER,
+    likes INTEGER,
+    comments INTEGER,
+    last_checked REAL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS watch_items_due ON watch_items (next_due);
+"""
+
+ITEM_COLUMNS = "id, url, platform, video_id, interval, views, likes, comments, last_checked, failures"
+
+# Относительный прирост просмотров за интервал, после которого видео считается «горячим»
+HOT_CHANGE_RATIO = 0.01
+
+
+@dataclass(slots=True)
+class WatchItem:
+    id: int
+    url: str
+    platform: str
+    video_id: Optional[str]
+    interval: float
+    views: Optional[int]
+    likes: Optional[int]
+    comments: Optional[int]
+    last_checked: Optional[float]
+    failures: int
+
+    @property
+    def counters(self) -> Optional[Counters]:
+        if self.views is None:
+            return None
+        return (self.views, self.likes or 0, self.comments or 0)
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "platform": self.platform,
+            "video_id": self.video_id,
+            "interval": self.interval,
+            "views": self.views,
+            "likes": self.likes,
+            "comments": self.comments,
+            "last_checked": self.last_checked,
+        }
+
+
+def next_interval(interval: float, previous: Optional[Counters], current: Counters,
+                  min_interval: float, max_interval: float) -> float:
+    """Чем быстрее растут счётчики, тем чаще обновляем; неизменные видео проверяем всё реже."""
+    if previous is None:
+        return min_interval
+    if current[0] - previous[0] >= max(previous[0], 1) * HOT_CHANGE_RATIO:
+        interval /= 2
+    elif current == previous:
+        interval *= 2
+    return min(max(interval, min_interval), max_interval)
+
+
+def _video_id_for(url: str, platform: str) -> Optional[str]:
+    if platform == "youtube":
+        try:
+            return extract_video_id_from_url(url)
+        except ValueError:
+            return None
+    if platform == "likee":
+        return extract_video_id_from_likee_url(url)
+    return None
+
+
+class Watchlist:
+    def __init__(self, path: str, min_interval: float = WATCHLIST_MIN_INTERVAL,
+                 max_interval: float = WATCHLIST_MAX_INTERVAL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        # Запись из другого воркера держит блокировку недолго: ждём её, а не падаем с "database is locked"
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self.series = DeltaSeries(self._conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # Без ROLLBACK соединение осталось бы в открытой транзакции и все следующие BEGIN падали бы
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def add(self, url: str) -> WatchItem:
+        url = url.strip()
+        platform = detect_platform(url)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO watch_items (url, platform, video_id, interval, next_due, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, platform, _video_id_for(url, platform), self.min_interval, 0, time.time()),
+            )
+            row = self._conn.execute(f"SELECT {ITEM_COLUMNS} FROM watch_items WHERE url = ?", (url,)).fetchone()
+        return WatchItem(*row)
+
+    def get(self, item_id: int) -> Optional[WatchItem]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {ITEM_COLUMNS} FROM watch_items WHERE id = ?", (item_id,)).fetchone()
+        return WatchItem(*row) if row else None
+
+    def entries(self) -> list[WatchItem]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {ITEM_COLUMNS} FROM watch_items ORDER BY id").fetchall()
+        return [WatchItem(*row) for row in rows]
+
+    def remove(self, item_id: int) -> bool:
+        with self._lock, self._transaction():
+            deleted = self._conn.execute("DELETE FROM watch_items WHERE id = ?", (item_id,)).rowcount
+            self.series.delete(item_id)
+        return bool(deleted)
+
+    def due(self, now: float, limit: int = WATCHLIST_BATCH_LIMIT) -> list[WatchItem]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {ITEM_COLUMNS} FROM watch_items WHERE next_due <= ? ORDER BY next_due LIMIT ?",
+                (now, limit),
+            ).fetchall()
+        return [WatchItem(*row) for row in rows]
+
+    def pending(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM watch_items WHERE next_due <= ?", (now,)).fetchone()[0]
+
+    def record(self, results: dict[int, Optional[Counters]], items: list[WatchItem], now: float) -> None:
+        with self._lock, self._transaction():
+            for item in items:
+                current = results.get(item.id)
+                if current is None:
+                    # Ошибка обновления: повторяем через обычный интервал, не сбивая адаптацию
+                    self._conn.execute(
+                        "UPDATE watch_items SET next_due = ?, failures = failures + 1 WHERE id = ?",
+                        (now + item.interval, item.id),
+                    )
+                    continue
+                interval = next_interval(item.interval, item.counters, current, self.min_interval, self.max_interval)
+                self.series.append(item.id, int(now), item.counters, current)
+                self._conn.execute(
+                    "UPDATE watch_items SET views = ?, likes = ?, comments = ?, interval = ?, next_due = ?, "
+                    "last_checked = ?, failures = 0 WHERE id = ?",
+                    (*current, interval, now + interval, now, item.id),
+                )
+
+    def history(self, item_id: int, since: int = 0) -> list[dict]:
+        with self._lock:
+            return self.series.history(item_id, since)
+
+
+def fetch_counters(item: WatchItem) -> Optional[Counters]:
+    try:
+        if item.platform == "likee":
+            info = extract_likee_info(item.url)
+            if not info:
+                return None
+            return (
+                parse_short_number(info.get('views', 0)),
+                parse_short_number(info.get('likes', 0)),
+                parse_short_number(info.get('comments', 0)),
+            )
+        with open_ydl(build_ydl_opts("metadata"), item.platform) as ydl:
+            meta = extract_metadata(ydl, item.url)
+        return (meta.view_count or 0, meta.like_count or 0, meta.comment_count or 0)
+    except Exception:
+        return None
+
+
+def refresh_items(items: list[WatchItem]) -> dict[int, Optional[Counters]]:
+    """Обновляет счётчики: YouTube — пачками videos.list, остальные платформы — пулом потоков."""
+    results: dict[int, Optional[Counters]] = {}
+    youtube = [item for item in items if item.platform == "youtube" and item.video_id and YOUTUBE_API_KEY]
+    if youtube:
+        try:
+            statistics = get_youtube_statistics_batch(list(dict.fromkeys(item.video_id for item in youtube)))
+        except Exception:
+            statistics = {}
+        for item in youtube:
+            results[item.id] = statistics.get(item.video_id)
+    others = [item for item in items if item.id not in results]
+    if others:
+        with ThreadPoolExecutor(max_workers=WATCHLIST_CONCURRENCY) as executor:
+            for item, counters in zip(others, executor.map(fetch_counters, others)):
+                results[item.id] = counters
+    return results
+
+
+def refresh_due(watchlist: Watchlist) -> int:
+    now = time.time()
+    items = watchlist.due(now)
+    if items:
+        watchlist.record(refresh_items(items), items, time.time())
+    return len(items)
+
+
+def try_acquire_leadership(path: str):
+    """Неблокирующий flock: планировщик работает только в одном воркере на хосте.
+
+    Блокировка снимается ОС при смерти процесса, и её подхватывает следующий воркер.
+    """
+    handle = open(path, "a+")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+async def run_scheduler(watchlist: Watchlist, tick: float) -> None:
+    leader = None
+    while True:
+        if leader is None:
+            leader = try_acquire_leadership(f"{watchlist.path}.lock")
+            if leader is None:
+                await asyncio.sleep(tick)
+                continue
+        try:
+            refreshed = await asyncio.to_thread(refresh_due, watchlist)
+        except Exception:
+            refreshed = 0
+        # Если пачка упёрлась в лимит, сразу берём следующую
+        if refreshed < WATCHLIST_BATCH_LIMIT:
+            await asyncio.sleep(tick)
+
+
+@lru_cache(maxsize=None)
+def get_watchlist() -> Watchlist:
+    watchlist = Watchlist(WATCHLIST_DB)
+    registry.gauge("parser_watchlist_items_due", "Watchlist items waiting for a refresh.", lambda: watchlist.pending(time.time()))
+    return watchlist
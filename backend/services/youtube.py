@@ -1,55 +1,170 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import requests
 from fastapi import HTTPException
 
-from core.config import YOUTUBE_API_KEY
+from core.config import (
+    YOUTUBE_API_KEY,
+    YOUTUBE_API_BASE,
+    YOUTUBE_CACHE_TTL,
+    YOUTUBE_CACHE_STALE_SECONDS,
+    YOUTUBE_CACHE_SIZE,
+)
+from services.cache import create_cache
+from services.metrics import registry, span
+from services.utils import get_shared_session
 
 
-def get_youtube_video_info_via_api(video_id: str) -> dict:
-    if not YOUTUBE_API_KEY:
-        raise ValueError("YouTube API ключ не найден в переменных окружения")
-    api_url = "https://www.googleapis.com/youtube/v3/videos"
+# Запись кэша: {'etag', 'info', 'fresh_until'}; в кэше живёт до конца окна stale-while-revalidate
+youtube_cache = create_cache("youtube", YOUTUBE_CACHE_SIZE)
+# Блокировки ревалидации: при общем бэкенде кэша одну запись обновляет только один воркер
+_revalidation_locks = create_cache("youtube-revalidate", YOUTUBE_CACHE_SIZE)
+REVALIDATION_LOCK_SECONDS = 60
+_revalidator = ThreadPoolExecutor(max_workers=4, thread_name_prefix="yt-revalidate")
+_revalidating: set[str] = set()
+_revalidating_lock = threading.Lock()
+
+YOUTUBE_ALL_PARTS = ('snippet', 'statistics', 'contentDetails')
+
+
+def _map_video(video_data: dict, video_id: str) -> dict:
+    snippet = video_data.get('snippet', {})
+    statistics = video_data.get('statistics', {})
+    view_count = int(statistics.get('viewCount', 0))
+    like_count = int(statistics.get('likeCount', 0))
+    comment_count = int(statistics.get('commentCount', 0))
+    # thumbnail url
+    thumbnail_url = snippet.get('thumbnails', {}).get('maxres', {}).get('url') or \
+                    snippet.get('thumbnails', {}).get('high', {}).get('url')
+    return {
+        'title': snippet.get('title', 'YouTube Video'),
+        'uploader': snippet.get('channelTitle', 'Unknown Channel'),
+        'channel': snippet.get('channelTitle', 'Unknown Channel'),
+        'view_count': view_count,
+        'like_count': like_count,
+        'comment_count': comment_count,
+        'thumbnail': thumbnail_url,
+        'description': snippet.get('description', ''),
+        'upload_date': snippet.get('publishedAt'),
+        'duration': video_data.get('contentDetails', {}).get('duration'),
+        'tags': snippet.get('tags', []),
+        'category_id': snippet.get('categoryId'),
+        'url': f"https://youtube.com/watch?v={video_id}",
+        'webpage_url': f"https://youtube.com/watch?v={video_id}",
+        '_youtube_video_id': video_id,
+        '_youtube_channel_id': snippet.get('channelId'),
+        'comments': [],
+    }
+
+
+def _fetch_video(video_id: str, parts: tuple[str, ...], etag: Optional[str] = None) -> Optional[dict]:
+    """Запрашивает videos.list; с etag делает условный запрос и на 304 возвращает None."""
     params = {
-        'part': 'snippet,statistics,contentDetails',
+        'part': ','.join(parts),
         'id': video_id,
         'key': YOUTUBE_API_KEY,
     }
-    try:
-        response = requests.get(api_url, params=params, timeout=30)
+    headers = {'If-None-Match': etag} if etag else None
+    with span("youtube.api", "youtube") as stage:
+        response = get_shared_session("youtube").get(f"{YOUTUBE_API_BASE}/videos", params=params, headers=headers, timeout=30)
+        if etag and response.status_code == 304:
+            stage.outcome = "not_modified"
+            return None
         response.raise_for_status()
         data = response.json()
-        if not data.get('items'):
-            raise HTTPException(status_code=404, detail=f"YouTube видео с ID {video_id} не найдено или недоступно")
-        video_data = data['items'][0]
-        snippet = video_data.get('snippet', {})
-        statistics = video_data.get('statistics', {})
-        view_count = int(statistics.get('viewCount', 0))
-        like_count = int(statistics.get('likeCount', 0))
-        comment_count = int(statistics.get('commentCount', 0))
-        # thumbnail url
-        thumbnail_url = snippet.get('thumbnails', {}).get('maxres', {}).get('url') or \
-                        snippet.get('thumbnails', {}).get('high', {}).get('url')
-        return {
-            'title': snippet.get('title', 'YouTube Video'),
-            'uploader': snippet.get('channelTitle', 'Unknown Channel'),
-            'channel': snippet.get('channelTitle', 'Unknown Channel'),
-            'view_count': view_count,
-            'like_count': like_count,
-            'comment_count': comment_count,
-            'thumbnail': thumbnail_url,
-            'description': snippet.get('description', ''),
-            'upload_date': snippet.get('publishedAt'),
-            'duration': video_data.get('contentDetails', {}).get('duration'),
-            'tags': snippet.get('tags', []),
-            'category_id': snippet.get('categoryId'),
-            'url': f"https://youtube.com/watch?v={video_id}",
-            'webpage_url': f"https://youtube.com/watch?v={video_id}",
-            '_youtube_video_id': video_id,
-            '_youtube_channel_id': snippet.get('channelId'),
-            'comments': [],
-        }
+    if not data.get('items'):
+        raise HTTPException(status_code=404, detail=f"YouTube видео с ID {video_id} не найдено или недоступно")
+    return {
+        'etag': data.get('etag') or response.headers.get('ETag'),
+        'info': _map_video(data['items'][0], video_id),
+        'fresh_until': time.time() + YOUTUBE_CACHE_TTL,
+    }
+
+
+def _store(key: str, entry: dict) -> None:
+    youtube_cache.set(key, entry, YOUTUBE_CACHE_TTL + YOUTUBE_CACHE_STALE_SECONDS)
+
+
+def _revalidate(key: str, video_id: str, parts: tuple[str, ...], entry: dict) -> None:
+    try:
+        fresh = _fetch_video(video_id, parts, entry.get('etag'))
+        if fresh is None:
+            # 304: данные не изменились, просто продлеваем свежесть без разбора JSON
+            fresh = {**entry, 'fresh_until': time.time() + YOUTUBE_CACHE_TTL}
+        _store(key, fresh)
+    except HTTPException:
+        youtube_cache.delete(key)
+    except Exception:
+        pass
+    finally:
+        _revalidation_locks.delete(key)
+        with _revalidating_lock:
+            _revalidating.discard(key)
+
+
+def _schedule_revalidation(key: str, video_id: str, parts: tuple[str, ...], entry: dict) -> None:
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        if not _revalidation_locks.add(key, os.getpid(), REVALIDATION_LOCK_SECONDS):
+            return
+        _revalidating.add(key)
+    _revalidator.submit(_revalidate, key, video_id, parts, entry)
+
+
+registry.gauge("parser_youtube_cache_entries", "Entries in the YouTube metadata cache.", lambda: len(youtube_cache))
+registry.gauge("parser_youtube_revalidations_in_flight", "Background YouTube cache revalidations in progress.", lambda: len(_revalidating))
+
+
+def get_youtube_video_info_via_api(video_id: str, parts: tuple[str, ...] = YOUTUBE_ALL_PARTS) -> dict:
+    if not YOUTUBE_API_KEY:
+        raise ValueError("YouTube API ключ не найден в переменных окружения")
+    key = f"{video_id}:{','.join(parts)}"
+    entry = youtube_cache.get(key)
+    if entry is not None:
+        if entry['fresh_until'] <= time.time():
+            # stale-while-revalidate: отвечаем из кэша, обновление идёт в фоне
+            _schedule_revalidation(key, video_id, parts, entry)
+        return dict(entry['info'])
+    try:
+        entry = _fetch_video(video_id, parts)
+        _store(key, entry)
+        return dict(entry['info'])
     except requests.RequestException as e:
         raise HTTPException(status_code=500, detail=f"Ошибка при обращении к YouTube API: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка обработки YouTube данных: {str(e)}")
 
 
+# videos.list принимает не больше 50 id за запрос
+YOUTUBE_BATCH_SIZE = 50
+
+
+def get_youtube_statistics_batch(video_ids: list[str]) -> dict[str, tuple[int, int, int]]:
+    """Счётчики (просмотры, лайки, комментарии) пачками по 50 id за один запрос videos.list."""
+    if not YOUTUBE_API_KEY:
+        raise ValueError("YouTube API ключ не найден в переменных окружения")
+    session = get_shared_session("youtube")
+    result: dict[str, tuple[int, int, int]] = {}
+    for start in range(0, len(video_ids), YOUTUBE_BATCH_SIZE):
+        batch = video_ids[start:start + YOUTUBE_BATCH_SIZE]
+        params = {
+            'part': 'statistics',
+            'id': ','.join(batch),
+            'key': YOUTUBE_API_KEY,
+        }
+        with span("youtube.statistics", "youtube"):
+            response = session.get(f"{YOUTUBE_API_BASE}/videos", params=params, timeout=30)
+            response.raise_for_status()
+        for item in response.json().get('items', []):
+            statistics = item.get('statistics', {})
+            result[item['id']] = (
+                int(statistics.get('viewCount', 0)),
+                int(statistics.get('likeCount', 0)),
+                int(statistics.get('commentCount', 0)),
+            )
+    return result
@@ -0,0 +1,140 @@
+import base64
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import orjson
+import requests
+from fastapi import HTTPException
+
+from core.config import YOUTUBE_API_KEY, YOUTUBE_API_BASE
+from services.metrics import span
+from services.utils import get_shared_session
+
+
+# Максимальный размер страницы commentThreads.list; фиксирован, чтобы курсоры оставались валидными
+PAGE_SIZE = 100
+
+
+def encode_cursor(video_id: str, order: str, page_token: Optional[str], offset: int) -> str:
+    raw = json.dumps({"v": video_id, "s": order, "p": page_token or "", "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, video_id: str, order: str) -> tuple[Optional[str], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset = int(data.get("o", 0))
+        if offset < 0 or offset >= PAGE_SIZE:
+            raise ValueError(offset)
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор комментариев")
+    # pageToken YouTube привязан к видео и порядку сортировки, с другими параметрами API его не примет
+    if data.get("v") != video_id or data.get("s") != order:
+        raise HTTPException(status_code=400, detail="Курсор выдан для другого видео или порядка сортировки")
+    return data.get("p") or None, offset
+
+
+def map_comment(item: dict) -> dict:
+    top = item.get('snippet', {}).get('topLevelComment', {})
+    snippet = top.get('snippet', {})
+    return {
+        'id': top.get('id') or item.get('id'),
+        'author': snippet.get('authorDisplayName'),
+        'author_channel_id': snippet.get('authorChannelId', {}).get('value'),
+        'text': snippet.get('textOriginal') or snippet.get('textDisplay'),
+        'likes': snippet.get('likeCount', 0),
+        'published_at': snippet.get('publishedAt'),
+        'reply_count': item.get('snippet', {}).get('totalReplyCount', 0),
+    }
+
+
+def fetch_comment_page(session: requests.Session, video_id: str, page_token: Optional[str], order: str) -> dict:
+    params = {
+        'part': 'snippet',
+        'videoId': video_id,
+        'maxResults': PAGE_SIZE,
+        'order': order,
+        'textFormat': 'plainText',
+        'key': YOUTUBE_API_KEY,
+    }
+    if page_token:
+        params['pageToken'] = page_token
+    try:
+        with span("youtube.comments", "youtube"):
+            response = session.get(f"{YOUTUBE_API_BASE}/commentThreads", params=params, timeout=30)
+    except requests.RequestException as e:
+        raise HTTPException(status_code=500, detail=f"Ошибка при обращении к YouTube API: {str(e)}")
+    if response.status_code == 404:
+        raise HTTPException(status_code=404, detail=f"YouTube видео с ID {video_id} не найдено или недоступно")
+    if response.status_code == 403:
+        raise HTTPException(status_code=403, detail="Комментарии к видео отключены или превышена квота YouTube API")
+    if response.status_code >= 400:
+        raise HTTPException(status_code=500, detail=f"Ошибка YouTube API: HTTP {response.status_code}")
+    return response.json()
+
+
+class CommentStream:
+    """Постраничный обход commentThreads.list с предзагрузкой следующей страницы.
+
+    В памяти одновременно живут только текущая и следующая страницы, поэтому
+    расход памяти не зависит от числа комментариев к видео.
+    """
+
+    def __init__(self, video_id: str, limit: int, cursor: Optional[str] = None, order: str = "time"):
+        if not YOUTUBE_API_KEY:
+            raise HTTPException(status_code=500, detail="YouTube API ключ не настроен")
+        self.video_id = video_id
+        self.limit = limit
+        self.order = order
+        self.page_token, self.offset = decode_cursor(cursor, video_id, order) if cursor else (None, 0)
+        self._session = get_shared_session("youtube")
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Первую страницу загружаем сразу, чтобы ошибки API вернулись обычным HTTP-ответом
+        self._first_page = self._fetch(self.page_token).result()
+
+    def _fetch(self, page_token: Optional[str]) -> "Future[dict]":
+        return self._executor.submit(fetch_comment_page, self._session, self.video_id, page_token, self.order)
+
+    def __iter__(self) -> Iterator[dict]:
+        try:
+            yield from self._iter_comments()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_comments(self) -> Iterator[dict]:
+        emitted = 0
+        page_token, offset = self.page_token, self.offset
+        page = self._first_page
+        self._first_page = None
+        while True:
+            next_token = page.get('nextPageToken')
+            items = page.get('items', [])
+            remaining = self.limit - emitted
+            # Следующую страницу запрашиваем до отдачи текущей, чтобы сеть работала параллельно с клиентом
+            prefetch = self._fetch(next_token) if next_token and len(items) - offset < remaining else None
+            for index in range(offset, len(items)):
+                if emitted >= self.limit:
+                    yield {'next_cursor': encode_cursor(self.video_id, self.order, page_token, index)}
+                    return
+                yield map_comment(items[index])
+                emitted += 1
+            if not next_token:
+                yield {'next_cursor': None}
+                return
+            if prefetch is None:
+                yield {'next_cursor': encode_cursor(self.video_id, self.order, next_token, 0)}
+                return
+            page_token, offset = next_token, 0
+            page = prefetch.result()
+
+
+def iter_ndjson(stream: CommentStream) -> Iterator[bytes]:
+    try:
+        for record in stream:
+            yield orjson.dumps(record) + b"\n"
+    except Exception as e:
+        # Заголовки уже отправлены: сообщаем об ошибке последней строкой потока
+        detail = e.detail if isinstance(e, HTTPException) else f"Ошибка при чтении комментариев: {str(e)}"
+        yield orjson.dumps({'error': detail}) + b"\n"
@@ -0,0 +1,202 @@
+import importlib
+import threading
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from services.metrics import span
+from services.proxy_pool import proxy_pool
+from services.readiness import FAILED, PENDING, READY, WARMING, readiness
+
+if TYPE_CHECKING:
+    import yt_dlp
+
+
+# Профили опций yt-dlp: общий набор для каждого сценария, прокси подставляется из пула
+PROFILES: dict[str, dict] = {
+    "info": {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': False,
+        'writeinfojson': False,
+        'writesubtitles': False,
+    },
+    # Только метаданные: без выбора и проверки форматов и без комментариев
+    "metadata": {
+        'quiet': True,
+        'no_warnings': True,
+        'skip_download': True,
+        'extract_flat': 'in_playlist',
+        'lazy_playlist': True,
+        'check_formats': False,
+        'getcomments': False,
+        'writeinfojson': False,
+        'writesubtitles': False,
+    },
+    "download": {
+        'quiet': True,
+        'format': 'best[ext=mp4]/best',
+    },
+}
+
+# Ошибки yt-dlp, которые указывают на проблему с прокси/выходным IP, а не с видео
+PROXY_ERROR_MARKERS = (
+    "proxy",
+    "tunnel",
+    "timed out",
+    "connection",
+    "unable to connect",
+    "too many requests",
+    "http error 429",
+)
+
+
+# Платформы, для которых parse использует облегчённый профиль "metadata"
+METADATA_PLATFORMS = {"vk", "tiktok", "instagram"}
+# Сколько раз следуем за url/url_transparent результатами без полной обработки
+MAX_URL_HOPS = 3
+
+
+def _upload_date(info: dict) -> Optional[str]:
+    if info.get('upload_date'):
+        return info['upload_date']
+    # Без обработки yt-dlp не выводит upload_date из timestamp — делаем это так же, как он (YYYYMMDD, UTC)
+    for key in ('timestamp', 'release_timestamp'):
+        timestamp = info.get(key)
+        if timestamp is None:
+            continue
+        try:
+            return datetime.fromtimestamp(float(timestamp), timezone.utc).strftime('%Y%m%d')
+        except (TypeError, ValueError, OverflowError, OSError):
+            continue
+    return None
+
+
+@dataclass(slots=True)
+class VideoMetadata:
+    title: Optional[str] = None
+    uploader: Optional[str] = None
+    channel: Optional[str] = None
+    view_count: Optional[int] = None
+    like_count: Optional[int] = None
+    comment_count: Optional[int] = None
+    thumbnail: Optional[str] = None
+    description: Optional[str] = None
+    upload_date: Optional[str] = None
+    duration: Optional[float] = None
+    tags: list[str] = field(default_factory=list)
+    url: Optional[str] = None
+    webpage_url: Optional[str] = None
+
+    @classmethod
+    def from_info(cls, info: dict) -> "VideoMetadata":
+        thumbnail = info.get('thumbnail')
+        if not thumbnail:
+            # Без обработки yt-dlp не выбирает thumbnail: берём последний (самый приоритетный)
+            thumbnails = [t.get('url') for t in info.get('thumbnails') or [] if t.get('url')]
+            thumbnail = thumbnails[-1] if thumbnails else None
+        return cls(
+            title=info.get('title'),
+            uploader=info.get('uploader'),
+            channel=info.get('channel'),
+            view_count=info.get('view_count'),
+            like_count=info.get('like_count'),
+            comment_count=info.get('comment_count'),
+            thumbnail=thumbnail,
+            description=info.get('description'),
+            upload_date=_upload_date(info),
+            duration=info.get('duration'),
+            tags=list(info.get('tags') or []),
+            url=info.get('url') if info.get('_type') is None else None,
+            webpage_url=info.get('webpage_url'),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'title': self.title,
+            'uploader': self.uploader,
+            'channel': self.channel,
+            'view_count': self.view_count,
+            'like_count': self.like_count,
+            'comment_count': self.comment_count,
+            'thumbnail': self.thumbnail,
+            'description': self.description,
+            'upload_date': self.upload_date,
+            'duration': self.duration,
+            'tags': self.tags,
+            'url': self.url,
+            'webpage_url': self.webpage_url,
+            'comments': [],
+        }
+
+
+# yt-dlp и его реестр экстракторов тяжёлые: грузим при первом использовании или в фоновом прогреве
+_yt_dlp: Optional[ModuleType] = None
+_load_lock = threading.Lock()
+readiness.set("ytdlp", PENDING)
+
+
+def load_ytdlp() -> ModuleType:
+    global _yt_dlp
+    if _yt_dlp is not None:
+        return _yt_dlp
+    with _load_lock:
+        if _yt_dlp is None:
+            readiness.set("ytdlp", WARMING)
+            try:
+                module = importlib.import_module("yt_dlp")
+            except Exception as e:
+                readiness.set("ytdlp", FAILED, str(e))
+                raise
+            _yt_dlp = module
+            readiness.set("ytdlp", READY)
+    return _yt_dlp
+
+
+def warm_up() -> None:
+    """Импортирует yt-dlp и строит реестр экстракторов, чтобы первый запрос не платил за это."""
+    try:
+        with span("warmup.ytdlp"), load_ytdlp().YoutubeDL({'quiet': True, 'no_warnings': True}):
+            pass
+    except Exception:
+        pass
+
+
+def build_ydl_opts(profile: str, **overrides) -> dict:
+    return {**PROFILES[profile], **overrides}
+
+
+def is_proxy_error(exc: BaseException) -> bool:
+    error_msg = str(exc).lower()
+    return any(marker in error_msg for marker in PROXY_ERROR_MARKERS)
+
+
+@contextmanager
+def open_ydl(opts: dict, platform: Optional[str] = None, stage: str = "ytdlp.extract") -> Iterator["yt_dlp.YoutubeDL"]:
+    YoutubeDL = load_ytdlp().YoutubeDL
+    # Время извлечения/скачивания — не задержка прокси, в EWMA его не пишем
+    with span(stage, platform or ""), proxy_pool.lease(platform, is_proxy_error, measure_latency=False) as proxy:
+        if proxy:
+            opts = {**opts, 'proxy': proxy}
+        with YoutubeDL(opts) as ydl:
+            yield ydl
+
+
+def extract_metadata(ydl: "yt_dlp.YoutubeDL", url: str) -> VideoMetadata:
+    info = ydl.extract_info(url, download=False, process=False)
+    for _ in range(MAX_URL_HOPS):
+        if not info or info.get('_type') not in ('url', 'url_transparent'):
+            break
+        outer = info
+        info = ydl.extract_info(outer['url'], download=False, process=False, ie_key=outer.get('ie_key'))
+        if outer.get('_type') == 'url_transparent' and info:
+            # Как и yt-dlp: поля внешнего url_transparent результата перекрывают поля внутреннего
+            info = {
+                **info,
+                **{k: v for k, v in outer.items() if v is not None and k not in ('_type', 'url', 'ie_key', 'id')},
+            }
+    if not info:
+        raise ValueError("yt-dlp не вернул метаданные")
+    return VideoMetadata.from_info(info)
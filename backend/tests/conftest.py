@@ -0,0 +1,25 @@
+import pytest
+
+from bench.mock_upstreams import MockUpstreams, UpstreamProfile
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture(scope="session")
+def upstreams():
+    with MockUpstreams(UpstreamProfile(payload_size=1000)) as mock:
+        yield mock
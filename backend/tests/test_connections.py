@@ -0,0 +1,46 @@
+import socket
+
+import pytest
+from urllib3.exceptions import NameResolutionError
+
+from services.connections import DnsCache, TimedHTTPSConnection
+from services.metrics import collect_timings, registry
+
+
+def test_dns_cache_serves_fresh_then_stale(clock, monkeypatch):
+    cache = DnsCache(ttl=60, stale_seconds=300, clock=clock)
+    calls = []
+
+    def resolver(host, port, family, type):
+        calls.append(host)
+        if len(calls) > 1:
+            raise socket.gaierror("temporary failure")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", resolver)
+    first = cache.resolve("example.test", 443)
+    assert cache.resolve("example.test", 443) == first
+    assert len(calls) == 1
+
+    clock.advance(61)
+    assert cache.resolve("example.test", 443) == first
+    clock.advance(300)
+    with pytest.raises(socket.gaierror):
+        cache.resolve("example.test", 443)
+
+
+def test_failed_resolution_records_no_tls_phase():
+    with collect_timings() as timings:
+        with pytest.raises(NameResolutionError):
+            TimedHTTPSConnection("nonexistent.invalid", 443, timeout=2).connect()
+    stages = {timing["stage"] for timing in timings}
+    assert "dns nonexistent.invalid" in stages
+    assert not any(stage.startswith(("tcp ", "tls ")) for stage in stages)
+
+
+def test_connect_metrics_label_upstream_not_host():
+    with pytest.raises(NameResolutionError):
+        TimedHTTPSConnection("cdn-123.nonexistent.invalid", 443, timeout=2).connect()
+    rendered = registry.render()
+    assert 'parser_connect_seconds_count{upstream="other",phase="dns",outcome="error"}' in rendered
+    assert "nonexistent.invalid" not in rendered
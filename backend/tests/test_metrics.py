@@ -0,0 +1,16 @@
+from services.metrics import upstream_label
+
+
+def test_upstream_label_maps_platform_domains():
+    assert upstream_label("www.googleapis.com") == "youtube"
+    assert upstream_label("i.ytimg.com") == "youtube"
+    assert upstream_label("video-sg3.like.video") == "likee"
+    assert upstream_label("sun9-12.userapi.com.") == "vk"
+    assert upstream_label("P16-Sign.TikTokCDN.com") == "tiktok"
+
+
+def test_upstream_label_bounds_unknown_hosts():
+    assert upstream_label("images.example.org") == "other"
+    assert upstream_label("203.0.113.7") == "other"
+    assert upstream_label("notyoutube.com") == "other"
+    assert upstream_label("") == "other"
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from services.timeseries import DeltaSeries
+from services.watchlist import Watchlist, next_interval
+
+
+@pytest.fixture
+def series():
+    return DeltaSeries(sqlite3.connect(":memory:"))
+
+
+def test_series_stores_deltas_and_rebuilds_history(series):
+    assert series.append(1, 100, None, (1000, 10, 1))
+    assert not series.append(1, 200, (1000, 10, 1), (1000, 10, 1))
+    assert series.append(1, 300, (1000, 10, 1), (1500, 12, 1))
+    stored = series.conn.execute("SELECT ts, d_views, d_likes, d_comments FROM samples ORDER BY ts").fetchall()
+    assert stored == [(100, 1000, 10, 1), (300, 500, 2, 0)]
+    assert series.history(1) == [
+        {"ts": 100, "views": 1000, "likes": 10, "comments": 1},
+        {"ts": 300, "views": 1500, "likes": 12, "comments": 1},
+    ]
+    assert series.history(1, since=200) == [{"ts": 300, "views": 1500, "likes": 12, "comments": 1}]
+
+
+def test_series_delete_is_per_item(series):
+    series.append(1, 100, None, (1, 1, 1))
+    series.append(2, 100, None, (2, 2, 2))
+    series.delete(1)
+    assert series.history(1) == []
+    assert len(series.history(2)) == 1
+
+
+@pytest.mark.parametrize("interval, previous, current, expected", [
+    (600, None, (10, 0, 0), 300),           # первое измерение
+    (600, (100, 0, 0), (100, 0, 0), 1200),  # ничего не изменилось — реже
+    (600, (100, 0, 0), (200, 0, 0), 300),   # быстрый рост — чаще
+    (600, (10000, 0, 0), (10050, 1, 0), 600),  # медленный рост — без изменений
+    (3000, (1, 1, 1), (1, 1, 1), 3600),     # верхняя граница
+    (400, (1, 0, 0), (100, 0, 0), 300),     # нижняя граница
+])
+def test_next_interval(interval, previous, current, expected):
+    assert next_interval(interval, previous, current, 300, 3600) == expected
+
+
+def test_record_rolls_back_failed_batch(tmp_path, monkeypatch):
+    watchlist = Watchlist(str(tmp_path / "watchlist.sqlite3"), min_interval=300, max_interval=3600)
+    item = watchlist.add("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    def broken_append(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(watchlist.series, "append", broken_append)
+        with pytest.raises(sqlite3.OperationalError):
+            watchlist.record({item.id: (10, 1, 0)}, [item], 1000)
+    assert watchlist.get(item.id).views is None
+
+    watchlist.record({item.id: (10, 1, 0)}, [item], 1000)
+    assert watchlist.get(item.id).views == 10
+    assert watchlist.history(item.id) == [{"ts": 1000, "views": 10, "likes": 1, "comments": 0}]
+    assert watchlist.remove(item.id)
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+import requests
+
+import services.youtube as youtube
+from bench.mock_upstreams import MISSING_VIDEO_PREFIX
+from services.cache import MemoryCache
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append((fn, args))
+
+    def run_all(self):
+        for fn, args in self.calls:
+            fn(*args)
+
+
+@pytest.fixture
+def youtube_api(monkeypatch, upstreams):
+    monkeypatch.setattr(youtube, "YOUTUBE_API_KEY", "test-key")
+    monkeypatch.setattr(youtube, "YOUTUBE_API_BASE", f"{upstreams.url}/youtube/v3")
+    monkeypatch.setattr(youtube, "youtube_cache", MemoryCache(100))
+    monkeypatch.setattr(youtube, "_revalidation_locks", MemoryCache(100))
+    executor = RecordingExecutor()
+    monkeypatch.setattr(youtube, "_revalidator", executor)
+    return executor
+
+
+def cache_key(video_id: str) -> str:
+    return f"{video_id}:{','.join(youtube.YOUTUBE_ALL_PARTS)}"
+
+
+def store_stale(video_id: str, etag: str) -> dict:
+    entry = {"etag": etag, "info": {"title": "cached", "_youtube_video_id": video_id}, "fresh_until": time.time() - 1}
+    youtube._store(cache_key(video_id), entry)
+    return entry
+
+
+def test_not_modified_extends_freshness_without_parsing(youtube_api, monkeypatch):
+    entry = store_stale("abc", '"bench-etag"')
+
+    def no_json(self):
+        raise AssertionError("ответ 304 не должен разбираться")
+
+    monkeypatch.setattr(requests.Response, "json", no_json)
+    youtube._revalidate(cache_key("abc"), "abc", youtube.YOUTUBE_ALL_PARTS, entry)
+    refreshed = youtube.youtube_cache.get(cache_key("abc"))
+    assert refreshed["info"] == entry["info"]
+    assert refreshed["fresh_until"] > time.time() + youtube.YOUTUBE_CACHE_TTL - 5
+
+
+def test_stale_entry_served_while_one_revalidation_runs(youtube_api):
+    store_stale("abc", '"old-etag"')
+    for _ in range(3):
+        assert youtube.get_youtube_video_info_via_api("abc")["title"] == "cached"
+    assert len(youtube_api.calls) == 1
+
+    youtube_api.run_all()
+    assert youtube.get_youtube_video_info_via_api("abc")["title"] == "Bench video abc"
+    assert not youtube._revalidating
+    assert len(youtube_api.calls) == 1
+
+
+def test_missing_video_during_revalidation_evicts_entry(youtube_api):
+    video_id = f"{MISSING_VIDEO_PREFIX}1"
+    entry = store_stale(video_id, '"old-etag"')
+    youtube._revalidate(cache_key(video_id), video_id, youtube.YOUTUBE_ALL_PARTS, entry)
+    assert youtube.youtube_cache.get(cache_key(video_id)) is None
@@ -0,0 +1,57 @@
+import pytest
+from fastapi import HTTPException
+
+import services.youtube_comments as youtube_comments
+from services.youtube_comments import PAGE_SIZE, CommentStream, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def youtube_api(monkeypatch, upstreams):
+    monkeypatch.setattr(youtube_comments, "YOUTUBE_API_KEY", "test-key")
+    monkeypatch.setattr(youtube_comments, "YOUTUBE_API_BASE", f"{upstreams.url}/youtube/v3")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("abc", "time", "token", 42)
+    assert decode_cursor(cursor, "abc", "time") == ("token", 42)
+    assert decode_cursor(encode_cursor("abc", "time", None, 0), "abc", "time") == (None, 0)
+
+
+@pytest.mark.parametrize("video_id, order", [("other", "time"), ("abc", "relevance")])
+def test_cursor_rejects_other_parameters(video_id, order):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(encode_cursor("abc", "time", "token", 1), video_id, order)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bnVsbA", encode_cursor("abc", "time", "t", PAGE_SIZE)])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "abc", "time")
+    assert exc.value.status_code == 400
+
+
+def test_stream_spans_pages_and_resumes(youtube_api):
+    records = list(CommentStream("abc", 150))
+    comments, tail = records[:-1], records[-1]
+    assert len(comments) == 150
+    assert comments[0]["id"] == "abc.0.0"
+    assert comments[-1]["id"] == "abc.1.49"
+    assert decode_cursor(tail["next_cursor"], "abc", "time") == ("1", 50)
+
+    resumed = list(CommentStream("abc", 60, tail["next_cursor"]))
+    assert [c["id"] for c in resumed[:-1]][:2] == ["abc.1.50", "abc.1.51"]
+    # 50 комментариев добивают страницу 1, ещё 10 — со страницы 2
+    assert decode_cursor(resumed[-1]["next_cursor"], "abc", "time") == ("2", 10)
+
+
+def test_stream_ends_on_page_boundary(youtube_api):
+    records = list(CommentStream("abc", PAGE_SIZE))
+    assert decode_cursor(records[-1]["next_cursor"], "abc", "time") == ("1", 0)
+
+
+def test_last_page_returns_null_cursor(youtube_api):
+    cursor = encode_cursor("abc", "time", "9", 90)
+    records = list(CommentStream("abc", 100, cursor))
+    assert len(records) == 11
+    assert records[-1] == {"next_cursor": None}
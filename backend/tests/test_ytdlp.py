@@ -0,0 +1,12 @@
+from services.ytdlp import VideoMetadata
+
+
+def test_upload_date_derived_from_timestamp():
+    assert VideoMetadata.from_info({"timestamp": 1704067200}).upload_date == "20240101"
+    assert VideoMetadata.from_info({"release_timestamp": 1704153599}).upload_date == "20240101"
+
+
+def test_upload_date_prefers_extractor_value():
+    info = {"upload_date": "20231231", "timestamp": 1704067200}
+    assert VideoMetadata.from_info(info).upload_date == "20231231"
+    assert VideoMetadata.from_info({}).upload_date is None